@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""Micro-benchmark: wafbypass.byteutils vs. the per-byte Python loops it replaced.
+
+Under Jython the payload is a Java byte[] as Burp hands it over, so the
+bulk JDK paths are measured; under CPython a bytearray stands in for it:
+
+    python benchmarks/bench_bytes.py
+"""
+import hashlib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from wafbypass import digest, hexdump, latin1, to_bytes, to_hex
+
+SIZE = 1024 * 1024
+
+try:
+    import jarray
+except ImportError:
+    jarray = None
+
+
+def make_payload(size):
+    chunk = b"POST /api HTTP/1.1\r\nHost: example.com\r\n\r\n{\"q\":\"admin' OR 1=1--\"}\x00\xff\x80"
+    data = (chunk * (size // len(chunk) + 1))[:size]
+    if jarray is not None:
+        return jarray.array([b - 256 if b > 127 else b for b in bytearray(data)], "b")
+    return bytearray(data)
+
+
+def legacy_latin1(data):
+    return "".join([chr(b & 0xff) for b in data])
+
+
+def legacy_hex(data):
+    return "".join(["%02x" % (b & 0xff) for b in data])
+
+
+def legacy_hexdump(data):
+    data = "".join([chr(b & 0xff) for b in data])
+    lines = []
+    for i in range(0, len(data), 16):
+        row = data[i:i + 16]
+        hex_part = " ".join(["%02x" % ord(c) for c in row])
+        text = "".join([c if 32 <= ord(c) < 127 else "." for c in row])
+        lines.append("%08x  %-47s  |%s|" % (i, hex_part, text))
+    return "\n".join(lines)
+
+
+def legacy_md5(data):
+    return hashlib.md5(legacy_latin1(data).encode("iso-8859-1")).digest()
+
+
+def timed(func, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        func()
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best * 1000.0
+
+
+def main():
+    payload = make_payload(SIZE)
+    assert latin1(payload) == legacy_latin1(payload)
+    assert to_hex(payload) == legacy_hex(payload)
+    assert digest(payload) == legacy_md5(payload)
+    cases = [
+        ("latin-1 decode", lambda: legacy_latin1(payload), lambda: latin1(payload)),
+        ("hex", lambda: legacy_hex(payload), lambda: to_hex(payload)),
+        ("hexdump", lambda: legacy_hexdump(payload), lambda: hexdump(payload)),
+        ("md5", lambda: legacy_md5(payload), lambda: digest(payload)),
+        ("to bytes", lambda: legacy_latin1(payload).encode("iso-8859-1"),
+         lambda: to_bytes(payload)),
+    ]
+    print("1 MB payload (%s)" % ("Java byte[]" if jarray is not None else "bytearray"))
+    print("%-16s %12s %12s %9s" % ("operation", "loop ms", "bulk ms", "speedup"))
+    for label, legacy, bulk in cases:
+        legacy_ms = timed(legacy, 3)
+        bulk_ms = timed(bulk)
+        print("%-16s %12.2f %12.2f %8.0fx" % (label, legacy_ms, bulk_ms,
+                                             legacy_ms / bulk_ms if bulk_ms else float("inf")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""Micro-benchmark: registry EncodingEngine vs. the original if/elif chain.
+
+"codecs only" disables the single-byte translate tables, so the gap to
+"engine cold" is what the tables save on an uncached body.
+
+Runs under CPython or Jython:
+
+    python benchmarks/bench_encoding.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from wafbypass import ENCODINGS, EncodingEngine
+
+SIZES = [("1 KB", 1024), ("100 KB", 100 * 1024), ("10 MB", 10 * 1024 * 1024)]
+
+
+def legacy_encode(data, encoding):
+    encoding_upper = encoding.upper().replace("-", "").replace("_", "")
+    if encoding_upper in ["IBM037", "CP037"]:
+        return data.encode("cp037")
+    elif encoding_upper in ["IBM500", "CP500"]:
+        return data.encode("cp500")
+    elif encoding_upper in ["IBM1026", "CP1026"]:
+        return data.encode("cp1026")
+    elif encoding_upper == "UTF16":
+        return data.encode("utf-16")
+    elif encoding_upper == "UTF16BE":
+        return data.encode("utf-16-be")
+    elif encoding_upper == "UTF16LE":
+        return data.encode("utf-16-le")
+    elif encoding_upper == "UTF32":
+        return data.encode("utf-32")
+    elif encoding_upper == "UTF32BE":
+        return data.encode("utf-32-be")
+    elif encoding_upper == "UTF32LE":
+        return data.encode("utf-32-le")
+    elif encoding_upper in ["ISO88591", "LATIN1"]:
+        return data.encode("iso-8859-1")
+    elif encoding_upper == "ISO885915":
+        return data.encode("iso-8859-15")
+    elif encoding_upper in ["WINDOWS1252", "CP1252"]:
+        return data.encode("windows-1252")
+    return data.encode(encoding)
+
+
+def make_body(size):
+    chunk = u'<item id="1"><name>admin\' OR 1=1--</name><value>payload</value></item>\n'
+    return (chunk * (size // len(chunk) + 1))[:size]
+
+
+def timed(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        func()
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best * 1000.0
+
+
+def main():
+    encodings = [name for name, _ in ENCODINGS]
+    print("%-8s %14s %14s %14s %14s %14s" % ("size", "legacy ms", "codecs only", "engine cold",
+                                             "engine warm", "encode_many"))
+    for label, size in SIZES:
+        body = make_body(size)
+        repeat = 3 if size > 1024 * 1024 else 20
+
+        def run_legacy():
+            for encoding in encodings:
+                legacy_encode(body, encoding)
+
+        def run_codecs():
+            engine = EncodingEngine(cache_entries=0, use_tables=False)
+            for encoding in encodings:
+                engine.encode(body, encoding)
+
+        def run_cold():
+            engine = EncodingEngine(cache_entries=2, cache_bytes=1024 * 1024 * 1024)
+            for encoding in encodings:
+                engine.encode(body, encoding)
+
+        warm = EncodingEngine(cache_bytes=1024 * 1024 * 1024)
+        warm.encode_many(body, encodings)
+
+        def run_warm():
+            for encoding in encodings:
+                warm.encode(body, encoding)
+
+        def run_many():
+            warm.encode_many(body, encodings)
+
+        print("%-8s %14.2f %14.2f %14.2f %14.2f %14.2f" % (
+            label, timed(run_legacy, repeat), timed(run_codecs, repeat), timed(run_cold, repeat),
+            timed(run_warm, repeat), timed(run_many, repeat)
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""Replay a fuzz matrix through the headless pipeline against a loopback stub.
+
+Reports generation, send and campaign throughput (variants/sec), p50/p99 send
+latency and peak RSS, so releases can be compared for regressions:
+
+    python benchmarks/bench_pipeline.py --body-kb 64 --workers 8 \\
+        --all-content-types --charset-variants --json
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from stub_server import StubServer
+from wafbypass import (CHARSET_STYLES, CONTENT_TYPES, FuzzConfig, FuzzPipeline,
+                       KeepAliveTransport, RequestTemplate, SocketTransport, Target, Transport)
+
+
+class TimingTransport(Transport):
+    """Wraps a transport and records the wall time of every send."""
+
+    def __init__(self, inner):
+        self._inner = inner
+        self._lock = threading.Lock()
+        self.latencies = []
+
+    def send(self, target, request):
+        return self.exchange(target, request)[0]
+
+    def exchange(self, target, request):
+        start = time.time()
+        try:
+            return self._inner.exchange(target, request)
+        finally:
+            elapsed = time.time() - start
+            with self._lock:
+                self.latencies.append(elapsed)
+
+    def close(self):
+        self._inner.close()
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[int(round(pct / 100.0 * (len(ordered) - 1)))]
+
+
+def peak_rss_kb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak //= 1024
+    return peak
+
+
+def make_request(port, body_kb, path="/api/items"):
+    chunk = u'{"user":"admin\' or 1=1--","note":"<script>alert(1)</script>"},'
+    items = (chunk * (body_kb * 1024 // len(chunk) + 1))[:body_kb * 1024 - 2]
+    body = u"[" + items.rstrip(u",") + u"]"
+    return (u"POST %s HTTP/1.1\r\n"
+            u"Host: 127.0.0.1:%d\r\n"
+            u"Content-Type: application/json\r\n"
+            u"Content-Length: %d\r\n"
+            u"Connection: close\r\n"
+            u"\r\n%s" % (path, port, len(body), body))
+
+
+def run(args):
+    server = StubServer(latency=args.latency_ms / 1000.0, block_page_kb=args.block_page_kb).start()
+    try:
+        if args.keep_alive:
+            inner = KeepAliveTransport(SocketTransport(timeout=30.0), max_connections=args.workers,
+                                       pipeline_depth=args.pipeline_depth)
+        else:
+            inner = SocketTransport(timeout=30.0)
+        transport = TimingTransport(inner)
+        pipeline = FuzzPipeline(transport, workers=args.workers, rate=args.rate,
+                                generators=args.generators,
+                                keep_response_bytes=None if args.keep_response_kb is None
+                                else args.keep_response_kb * 1024)
+        pipeline.set_adaptive(args.adaptive, args.block_threshold, args.max_bypasses)
+        target = Target("127.0.0.1", server.port, False)
+        templates = list(CONTENT_TYPES) if args.all_content_types else [CONTENT_TYPES[0]]
+        styles = CHARSET_STYLES if args.charset_variants else ["canonical"]
+        config = FuzzConfig(templates, styles)
+        requests = [(RequestTemplate(make_request(server.port, args.body_kb, "/api/items/%d" % i)),
+                     target) for i in range(args.endpoints)]
+
+        start = time.time()
+        for template, _ in requests:
+            matrix = pipeline.generate(template, config.matrix())
+        generate_time = time.time() - start
+        variants = len(pipeline.store)
+
+        start = time.time()
+        pipeline.submit_all(target)
+        pipeline.dispatcher.wait_idle()
+        send_time = time.time() - start
+
+        campaign_time = None
+        if args.endpoints > 1:
+            pipeline.reset()
+            start = time.time()
+            pipeline.run_campaign(requests, config)
+            pipeline.dispatcher.wait_idle()
+            campaign_time = time.time() - start
+
+        verdicts = {}
+        skipped = 0
+        for index in pipeline.store.indices():
+            result = pipeline.store.get(index)
+            if result.note.startswith("Skipped"):
+                skipped += 1
+                continue
+            verdict = pipeline.verdict(index, result)
+            verdicts[verdict] = verdicts.get(verdict, 0) + 1
+        report = {
+            "body_kb": args.body_kb,
+            "workers": args.workers,
+            "generators": pipeline.generators.workers,
+            "keep_alive": args.keep_alive,
+            "pipeline_depth": args.pipeline_depth,
+            "endpoints": args.endpoints,
+            "combinations": matrix.total * args.endpoints,
+            "variants": variants,
+            "duplicates": matrix.duplicates * args.endpoints,
+            "sent": variants - skipped,
+            "skipped": skipped,
+            "generate_per_sec": variants / generate_time if generate_time else 0.0,
+            "send_per_sec": variants / send_time if send_time else 0.0,
+            "campaign_per_sec": variants / campaign_time if campaign_time else None,
+            "p50_ms": percentile(transport.latencies, 50) * 1000.0,
+            "p99_ms": percentile(transport.latencies, 99) * 1000.0,
+            "peak_rss_kb": peak_rss_kb(),
+            "stored_kb": pipeline.store.stored_bytes // 1024,
+            "verdicts": verdicts,
+            "stages": dict((stage, {"count": count, "mean_ms": mean / 1e6, "p50_ms": p50 / 1e6,
+                                    "p99_ms": p99 / 1e6, "total_s": total / 1e9})
+                           for stage, count, mean, p50, _, p99, _, total
+                           in pipeline.metrics.snapshot()),
+        }
+        pipeline.close()
+        return report
+    finally:
+        server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--body-kb", type=int, default=4)
+    parser.add_argument("--endpoints", type=int, default=1,
+                        help="distinct endpoints; >1 also times campaign mode end to end")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--generators", type=int, default=None,
+                        help="generation threads (default: all cores under Jython, 1 under CPython)")
+    parser.add_argument("--rate", type=float, default=0, help="requests/sec cap, 0 = unlimited")
+    parser.add_argument("--latency-ms", type=float, default=0, help="simulated backend latency")
+    parser.add_argument("--keep-alive", action="store_true", help="pooled keep-alive connections")
+    parser.add_argument("--pipeline-depth", type=int, default=1)
+    parser.add_argument("--adaptive", action="store_true", help="adaptive early-stop scheduler")
+    parser.add_argument("--block-threshold", type=int, default=3)
+    parser.add_argument("--max-bypasses", type=int, default=3)
+    parser.add_argument("--block-page-kb", type=int, default=0, help="pad the stub's 403 page")
+    parser.add_argument("--keep-response-kb", type=int, default=None,
+                        help="store only this much of each response (default: all of it)")
+    parser.add_argument("--all-content-types", action="store_true")
+    parser.add_argument("--charset-variants", action="store_true")
+    parser.add_argument("--json", action="store_true", help="print one JSON line")
+    args = parser.parse_args()
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, sort_keys=True))
+        return
+    print("variants        %d of %d combinations (%d duplicates)" % (
+        report["variants"], report["combinations"], report["duplicates"]))
+    print("sent            %d (%d skipped by the scheduler)" % (report["sent"], report["skipped"]))
+    print("generate        %.1f variants/sec" % report["generate_per_sec"])
+    print("send            %.1f variants/sec" % report["send_per_sec"])
+    if report["campaign_per_sec"] is not None:
+        print("campaign        %.1f variants/sec across %d endpoints" % (
+            report["campaign_per_sec"], report["endpoints"]))
+    print("latency         p50 %.2f ms, p99 %.2f ms" % (report["p50_ms"], report["p99_ms"]))
+    print("peak RSS        %s KB, %s KB of request/response bytes stored" % (
+        report["peak_rss_kb"], report["stored_kb"]))
+    for stage, stats in sorted(report["stages"].items()):
+        print("stage %-9s %6d x  mean %.3f ms  p50 %.3f ms  p99 %.3f ms  total %.2f s" % (
+            stage, stats["count"], stats["mean_ms"], stats["p50_ms"], stats["p99_ms"],
+            stats["total_s"]))
+    print("verdicts        %s" % ", ".join("%s=%d" % item for item in sorted(report["verdicts"].items())))
+
+
+if __name__ == "__main__":
+    main()
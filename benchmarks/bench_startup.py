@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""Startup benchmark: eager vs. deferred initialisation of the headless core.
+
+Each sample runs in a fresh interpreter, so module imports and codec
+translate tables are measured cold. "eager" is what extension load used
+to pay before the tab was ever shown: importing wafbypass and building a
+pipeline with every codec and table resolved. "deferred" is what load
+pays now, with nothing from wafbypass imported until the panel is first
+used; that import and the pipeline then show up under "first use". The
+Swing panel module needs Burp, so it is not part of this measurement;
+the extension logs its load time on first display.
+
+Runs under CPython or Jython:
+
+    python benchmarks/bench_startup.py --runs 10 --json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+CHILD = r"""
+import sys, time
+sys.path.insert(0, %(root)r)
+start = time.time()
+if %(eager)r:
+    from wafbypass import ENCODINGS, EncodingEngine, FuzzPipeline, Transport
+    pipeline = FuzzPipeline(Transport(), engine=EncodingEngine(preload=True))
+loaded = time.time()
+if not %(eager)r:
+    from wafbypass import ENCODINGS, FuzzPipeline, Transport
+    pipeline = FuzzPipeline(Transport())
+for name, _ in ENCODINGS:
+    pipeline.engine.encode(u'{"q": "admin\' OR 1=1--"}', name)
+used = time.time()
+pipeline.close()
+print("%%f %%f" %% (loaded - start, used - loaded))
+"""
+
+
+def sample(eager):
+    output = subprocess.check_output([sys.executable, "-c", CHILD % {"root": ROOT, "eager": eager}])
+    return [float(value) * 1000.0 for value in output.decode("ascii").split()]
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per mode")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+    results = {}
+    for mode, eager in (("eager", True), ("deferred", False)):
+        samples = [sample(eager) for _ in range(args.runs)]
+        results[mode] = {
+            "load_ms": median([s[0] for s in samples]),
+            "first_use_ms": median([s[1] for s in samples]),
+            "total_ms": median([s[0] + s[1] for s in samples]),
+        }
+    if args.json:
+        print(json.dumps(results, indent=2, sort_keys=True))
+        return
+    print("%-10s %12s %14s %12s" % ("mode", "load ms", "first use ms", "total ms"))
+    for mode in ("eager", "deferred"):
+        row = results[mode]
+        print("%-10s %12.2f %14.2f %12.2f" % (mode, row["load_ms"], row["first_use_ms"],
+                                              row["total_ms"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""Loopback HTTP stub that imitates a WAF in front of a backend.
+
+Bodies containing a plain ASCII attack marker get a 403 block page; any
+other body reaches the "backend", which answers 500 for bodies it cannot
+decode as UTF-8 and 200 otherwise. Optional latency simulates a slow
+target. Runs in a background thread on 127.0.0.1 and an ephemeral port.
+"""
+import threading
+import time
+
+try:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+except ImportError:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+
+ATTACK_MARKERS = (b"<script", b"' or 1=1", b"union select", b"../")
+
+BLOCK_PAGE = (b"<html><head><title>403 Forbidden</title></head><body>"
+              b"<h1>Request blocked</h1><p>Incident ID: %d</p></body></html>")
+
+
+class _ThreadingServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    counter = [0]
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        self.counter[0] += 1
+        lowered = body.lower()
+        if any(marker in lowered for marker in ATTACK_MARKERS):
+            self._reply(403, BLOCK_PAGE % self.counter[0] + self.server.padding)
+            return
+        try:
+            body.decode("utf-8")
+        except UnicodeDecodeError:
+            self._reply(500, b"<html><body>Internal Server Error: malformed input</body></html>")
+            return
+        self._reply(200, b'{"status":"ok"}')
+
+    do_PUT = do_POST
+    do_GET = do_POST
+
+    def _reply(self, status, payload):
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(object):
+
+    def __init__(self, latency=0.0, block_page_kb=0):
+        self._server = _ThreadingServer(("127.0.0.1", 0), _StubHandler)
+        self._server.latency = latency
+        # Real block pages often carry kilobytes of inline CSS and scripts.
+        self._server.padding = b"<!--" + b"x" * max(0, block_page_kb * 1024 - 7) + b"-->" \
+            if block_page_kb else b""
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+if __name__ == "__main__":
+    server = StubServer().start()
+    print("Stub WAF listening on 127.0.0.1:%d (Ctrl+C to stop)" % server.port)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
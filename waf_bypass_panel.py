@@ -0,0 +1,1462 @@
+# -*- coding: utf-8 -*-
+"""Swing panel of the WAF Bypass Encoder.
+
+Imported by waf_bypass_burp.py only when the suite tab is first shown or
+a context menu action is used, so Burp startup does not pay for loading
+this module or the wafbypass package.
+"""
+from burp import IHttpListener
+from javax.swing import (JPanel, JButton, JTextArea, JScrollPane, JLabel, 
+                         JComboBox, JCheckBox, JTable, JTabbedPane, JSplitPane,
+                         JTextField, SwingUtilities, JOptionPane,
+                         BorderFactory, BoxLayout, Box, ListSelectionModel,
+                         JFileChooser, ProgressMonitor, Timer)
+from javax.swing.border import TitledBorder
+from javax.swing.filechooser import FileNameExtensionFilter
+from javax.swing.table import AbstractTableModel
+from java.awt import BorderLayout, FlowLayout, Font, Dimension, Color, GridLayout
+from java.awt.event import MouseAdapter
+from java.lang import Runnable, Thread
+from java.io import File
+from java.util.concurrent import ConcurrentLinkedQueue
+import os
+import threading
+import time
+
+from wafbypass import (CHARSET_STYLES, CONTENT_TYPES, DEBUG, ENCODINGS,
+                       ERROR, INFO, STREAM_CHUNK_CHARS, WARN, FuzzConfig, FuzzPipeline,
+                       KeepAliveTransport,
+                       PassiveExpander, PipelineListener, RequestTemplate, Target, Transport, VariantCache,
+                       clock, export_format, export_results, hexdump, index_regions, latin1,
+                       to_bytes, to_hex)
+
+PREVIEW_BYTES = 64 * 1024
+HEX_PREVIEW_BYTES = 4 * 1024
+
+
+class PagedBytesViewer(JPanel):
+    """Read-only text/hex view that renders one page of a buffer at a time.
+
+    Pages are converted on a background thread with bulk Latin-1 decoding
+    and handed to the EDT, so selecting a multi-megabyte response only ever
+    puts a single page into the text area.
+    """
+
+    TEXT_PAGE_BYTES = 64 * 1024
+    HEX_PAGE_BYTES = 4 * 1024
+
+    def __init__(self):
+        JPanel.__init__(self, BorderLayout())
+        self._length = 0
+        self._loader = None
+        self._page = 0
+        self._generation = 0
+        toolbar = JPanel(FlowLayout(FlowLayout.LEFT, 5, 2))
+        self._mode_combo = JComboBox(["Text", "Hex"])
+        self._mode_combo.addActionListener(lambda e: self._setPage(0))
+        toolbar.add(self._mode_combo)
+        prev_btn = JButton("<")
+        prev_btn.addActionListener(lambda e: self._setPage(self._page - 1))
+        toolbar.add(prev_btn)
+        next_btn = JButton(">")
+        next_btn.addActionListener(lambda e: self._setPage(self._page + 1))
+        toolbar.add(next_btn)
+        self._page_label = JLabel("")
+        toolbar.add(self._page_label)
+        self.add(toolbar, BorderLayout.NORTH)
+        self._area = JTextArea()
+        self._area.setFont(Font("Monospaced", Font.PLAIN, 11))
+        self._area.setEditable(False)
+        self.add(JScrollPane(self._area), BorderLayout.CENTER)
+
+    def setData(self, data):
+        if data is None:
+            self.setSource(0, None)
+        else:
+            data = to_bytes(data)
+            self.setSource(len(data), lambda offset, size: data[offset:offset + size])
+
+    def setSource(self, length, loader):
+        """Show `length` bytes fetched page by page via loader(offset, size)."""
+        self._length = length
+        self._loader = loader
+        self._setPage(0)
+
+    def _isHex(self):
+        return self._mode_combo.getSelectedItem() == "Hex"
+
+    def _pageSize(self):
+        return self.HEX_PAGE_BYTES if self._isHex() else self.TEXT_PAGE_BYTES
+
+    def _setPage(self, page):
+        self._generation += 1
+        if self._loader is None or self._length == 0:
+            self._page = 0
+            self._page_label.setText("")
+            self._area.setText("")
+            return
+        size = self._pageSize()
+        pages = (self._length + size - 1) // size
+        self._page = max(0, min(page, pages - 1))
+        self._page_label.setText("Page %d/%d (%d bytes)" % (self._page + 1, pages, self._length))
+        self._area.setText("Loading...")
+        Thread(PageRenderer(self, self._generation, self._loader, self._page * size, size,
+                            self._isHex())).start()
+
+    def _showPage(self, generation, text):
+        if generation == self._generation:
+            self._area.setText(text)
+            self._area.setCaretPosition(0)
+
+
+class PageRenderer(Runnable):
+    def __init__(self, viewer, generation, loader, offset, size, hex_mode):
+        self._viewer = viewer
+        self._generation = generation
+        self._loader = loader
+        self._offset = offset
+        self._size = size
+        self._hex_mode = hex_mode
+
+    def run(self):
+        try:
+            page = self._loader(self._offset, self._size)
+            if self._hex_mode:
+                text = hexdump(page, self._offset)
+            else:
+                text = latin1(page)
+        except Exception as e:
+            text = "Unable to display data: %s" % str(e)
+        viewer, generation = self._viewer, self._generation
+        SwingUtilities.invokeLater(lambda: viewer._showPage(generation, text))
+
+
+class ResultTableModel(AbstractTableModel):
+    """Fuzz results table read straight from the ResultStore.
+
+    Rows only hold result indices; cell values come from FuzzResult
+    metadata. Rows are appended on the EDT by TableUpdateCoalescer.
+    """
+
+    COLUMNS = ["#", "Endpoint", "Encoding", "Content-Type", "Status", "Length", "Time(ms)",
+               "TTFB(ms)", "Cluster", "Verdict", "Note"]
+
+    def __init__(self, pipeline):
+        AbstractTableModel.__init__(self)
+        self._pipeline = pipeline
+        self._store = pipeline.store
+        self._rows = []
+        self._row_of = {}
+
+    def getRowCount(self):
+        return len(self._rows)
+
+    def getColumnCount(self):
+        return len(self.COLUMNS)
+
+    def getColumnName(self, column):
+        return self.COLUMNS[column]
+
+    def getValueAt(self, row, column):
+        index = self._rows[row]
+        if column == 0:
+            return index
+        result = self._store.get(index)
+        if result is None:
+            return ""
+        sent = result.note != "Ready"
+        if column == 1:
+            return "E%d" % result.endpoint.id if result.endpoint else "-"
+        if column == 2:
+            return result.encoding
+        if column == 3:
+            return result.content_type
+        if column == 4:
+            return result.status_code if result.status_code > 0 else "-"
+        if column == 5:
+            return result.response_length if sent else result.request_length
+        if column == 6:
+            return result.response_time if sent else "-"
+        if column == 7:
+            return result.ttfb if sent and result.ttfb is not None else "-"
+        if column == 8:
+            return "C%d" % result.cluster if result.cluster else "-"
+        if column == 9:
+            return self._pipeline.verdict(index, result)
+        return result.note
+
+    def index_at(self, row):
+        return self._rows[row]
+
+    def row_of(self, index):
+        return self._row_of.get(index, -1)
+
+    def append_rows(self, indices):
+        first = len(self._rows)
+        for index in indices:
+            self._row_of[index] = len(self._rows)
+            self._rows.append(index)
+        self.fireTableRowsInserted(first, len(self._rows) - 1)
+
+    def clear(self):
+        self._rows = []
+        self._row_of = {}
+        self.fireTableDataChanged()
+
+
+class EndpointTableModel(AbstractTableModel):
+    """Per-endpoint campaign progress, polled by the panel's status timer."""
+
+    COLUMNS = ["#", "Endpoint", "Target", "Variants", "Done", "Differs", "Status"]
+
+    def __init__(self, pipeline):
+        AbstractTableModel.__init__(self)
+        self._pipeline = pipeline
+        self._row_count = 0
+
+    def getRowCount(self):
+        return self._row_count
+
+    def getColumnCount(self):
+        return len(self.COLUMNS)
+
+    def getColumnName(self, column):
+        return self.COLUMNS[column]
+
+    def getValueAt(self, row, column):
+        endpoint = self._pipeline.endpoints[row]
+        if column == 0:
+            return "E%d" % endpoint.id
+        if column == 1:
+            return endpoint.label
+        if column == 2:
+            target = endpoint.target
+            if target is None:
+                return "(panel target)"
+            return "%s://%s:%d" % ("https" if target.use_https else "http", target.host, target.port)
+        if column == 3:
+            return endpoint.variants
+        if column == 4:
+            return endpoint.completed
+        if column == 5:
+            return endpoint.differs
+        return endpoint.status
+
+    def endpoint_at(self, row):
+        return self._pipeline.endpoints[row]
+
+    def refresh(self):
+        count = len(self._pipeline.endpoints)
+        if count < self._row_count:
+            self._row_count = count
+            self.fireTableDataChanged()
+            return
+        if count > self._row_count:
+            first, self._row_count = self._row_count, count
+            self.fireTableRowsInserted(first, count - 1)
+        if count:
+            self.fireTableRowsUpdated(0, count - 1)
+
+
+class StatsTableModel(AbstractTableModel):
+    """Per-stage timing breakdown from the pipeline's MetricsRegistry."""
+
+    COLUMNS = ["Stage", "Count", "Rate/s", "Mean(ms)", "p50(ms)", "p95(ms)", "p99(ms)",
+               "Max(ms)", "Total(s)", "Share"]
+
+    def __init__(self, metrics):
+        AbstractTableModel.__init__(self)
+        self._metrics = metrics
+        self._rows = []
+
+    def getRowCount(self):
+        return len(self._rows)
+
+    def getColumnCount(self):
+        return len(self.COLUMNS)
+
+    def getColumnName(self, column):
+        return self.COLUMNS[column]
+
+    def getValueAt(self, row, column):
+        return self._rows[row][column]
+
+    def refresh(self):
+        snapshot = self._metrics.snapshot()
+        grand_total = float(sum([row[7] for row in snapshot]) or 1)
+        rows = []
+        for stage, count, mean, p50, p95, p99, peak, total in snapshot:
+            rows.append([stage, count, "%.1f" % self._metrics.rate(stage)]
+                        + ["%.3f" % (value / 1e6) for value in (mean, p50, p95, p99, peak)]
+                        + ["%.2f" % (total / 1e9), "%.0f%%" % (100.0 * total / grand_total)])
+        self._rows = rows
+        self.fireTableDataChanged()
+
+
+class TableUpdateCoalescer(object):
+    """Buffers row inserts/updates from worker threads and applies them on a
+    Swing timer as one fireTableRowsInserted and one fireTableRowsUpdated
+    range per frame, instead of one invokeLater per row or cell. The delay
+    from each update to the frame that shows it is recorded as "ui".
+    """
+
+    def __init__(self, model, metrics=None, interval_ms=100):
+        self._model = model
+        self._metrics = metrics
+        self._lock = threading.Lock()
+        self._inserted = []
+        self._updated = {}
+        self._refresh_all = False
+        self._timer = Timer(interval_ms, lambda e: self.flush())
+        self._timer.start()
+
+    def row_added(self, index):
+        with self._lock:
+            self._inserted.append((index, clock()))
+
+    def row_changed(self, index):
+        stamp = clock()
+        with self._lock:
+            self._updated.setdefault(index, stamp)
+
+    def all_changed(self):
+        with self._lock:
+            self._refresh_all = True
+
+    def reset(self):
+        with self._lock:
+            self._inserted = []
+            self._updated = {}
+
+    def stop(self):
+        self._timer.stop()
+
+    def flush(self):
+        with self._lock:
+            inserted, self._inserted = self._inserted, []
+            updated, self._updated = self._updated, {}
+            refresh_all, self._refresh_all = self._refresh_all, False
+        if inserted:
+            self._model.append_rows([index for index, _ in inserted])
+        if refresh_all and self._model.getRowCount():
+            self._model.fireTableRowsUpdated(0, self._model.getRowCount() - 1)
+        else:
+            rows = [self._model.row_of(index) for index in updated]
+            rows = [row for row in rows if row >= 0]
+            if rows:
+                self._model.fireTableRowsUpdated(min(rows), max(rows))
+        if self._metrics is not None:
+            now = clock()
+            for index, stamp in inserted:
+                self._metrics.record("ui", now - stamp, index)
+            for index, stamp in updated.items():
+                self._metrics.record("ui", now - stamp, index)
+
+
+class LogSink(object):
+    """Lock-free log queue drained into the log panel on a Swing timer.
+
+    Callers on any thread only enqueue; the timer appends each batch with
+    one JTextArea.append, trims the panel to max_lines and mirrors the
+    batch to stdout. Messages below the current level are dropped at once.
+    """
+
+    LEVELS = [("Debug", DEBUG), ("Info", INFO), ("Warning", WARN), ("Error", ERROR)]
+
+    def __init__(self, area, stdout, max_lines=5000, interval_ms=200):
+        self._area = area
+        self._stdout = stdout
+        self._queue = ConcurrentLinkedQueue()
+        self.max_lines = max_lines
+        self.level = DEBUG
+        self._timer = Timer(interval_ms, lambda e: self.flush())
+        self._timer.start()
+
+    def log(self, message, level=INFO):
+        if level >= self.level:
+            self._queue.offer((time.strftime("%H:%M:%S"), message))
+
+    def flush(self):
+        entries = []
+        entry = self._queue.poll()
+        while entry is not None:
+            entries.append(entry)
+            entry = self._queue.poll()
+        if not entries:
+            return
+        entries = entries[-self.max_lines:]
+        self._area.append("".join(["[%s] %s\n" % entry for entry in entries]))
+        self._trim()
+        self._area.setCaretPosition(self._area.getDocument().getLength())
+        self._stdout.println("\n".join([message for _, message in entries]))
+
+    def clear(self):
+        self._queue.clear()
+        self._area.setText("")
+
+    def stop(self):
+        self._timer.stop()
+
+    def _trim(self):
+        root = self._area.getDocument().getDefaultRootElement()
+        excess = root.getElementCount() - 1 - self.max_lines
+        if excess > 0:
+            end = root.getElement(excess - 1).getEndOffset()
+            self._area.getDocument().remove(0, end)
+
+
+class BurpTransport(Transport):
+    """Sends through IBurpExtenderCallbacks.makeHttpRequest."""
+
+    def __init__(self, callbacks):
+        self._callbacks = callbacks
+
+    def send(self, target, request):
+        response = self._callbacks.makeHttpRequest(target.host, target.port,
+                                                   target.use_https, request)
+        if response is None or len(response) == 0:
+            return None
+        return to_bytes(response)
+
+
+class PanelListener(PipelineListener):
+    """Maps pipeline events onto the panel's log sink and table coalescer."""
+
+    def __init__(self, panel):
+        self._panel = panel
+
+    def log(self, message, level=INFO):
+        self._panel._log(message, level)
+
+    def result_added(self, index, result):
+        self._panel._table_updates.row_added(index)
+
+    def result_updated(self, index, result):
+        self._panel._table_updates.row_changed(index)
+
+    def baseline_changed(self, endpoint):
+        self._panel._table_updates.all_changed()
+
+
+class PassiveListener(IHttpListener):
+    """Hands finished Proxy/Repeater messages to the PassiveExpander.
+
+    Runs on Burp's proxy threads, so it does nothing but an int check and
+    a non-blocking offer(); parsing and scope checks happen in the workers.
+    """
+
+    def __init__(self, expander, tools):
+        self._expander = expander
+        self._tools = frozenset(tools)
+
+    def processHttpMessage(self, toolFlag, messageIsRequest, messageInfo):
+        if not messageIsRequest and toolFlag in self._tools:
+            self._expander.offer(messageInfo)
+
+
+class WAFBypassPanel(JPanel):
+    
+    def __init__(self, callbacks, helpers, stdout):
+        JPanel.__init__(self)
+        self._callbacks = callbacks
+        self._helpers = helpers
+        self._stdout = stdout
+        self._burp_transport = BurpTransport(callbacks)
+        self._pipeline = FuzzPipeline(self._burp_transport, PanelListener(self))
+        self._cache = None
+        self._current_request = None
+        self._current_http_service = None
+        self._project_path = None
+        self._save_lock = threading.Lock()
+        self._passive = None
+        self._passive_listener = None
+        self._initUI()
+        self._applyRetentionSettings()
+        self._dispatch_timer = Timer(500, lambda e: self._refreshDispatchStatus())
+        self._dispatch_timer.start()
+        last_project = callbacks.loadExtensionSetting("project_path")
+        if last_project and os.path.isfile(last_project):
+            self._openProject(last_project)
+    
+    def _initUI(self):
+        self.setLayout(BorderLayout(5, 5))
+        self.setBorder(BorderFactory.createEmptyBorder(10, 10, 10, 10))
+        control_panel = self._createControlPanel()
+        self.add(control_panel, BorderLayout.NORTH)
+        main_split = JSplitPane(JSplitPane.VERTICAL_SPLIT)
+        main_split.setResizeWeight(0.6)
+        request_tabs = JTabbedPane()
+        request_tabs.addTab("Full Request", self._createRequestPanel())
+        request_tabs.addTab("Request Body", self._createBodyPanel())
+        request_tabs.addTab("Encoded Output", self._createOutputPanel())
+        main_split.setTopComponent(request_tabs)
+        bottom_split = JSplitPane(JSplitPane.HORIZONTAL_SPLIT)
+        bottom_split.setResizeWeight(0.5)
+        bottom_split.setLeftComponent(self._createFuzzResultPanel())
+        detail_tabs = JTabbedPane()
+        detail_tabs.addTab("Request Detail", self._createDetailPanel())
+        detail_tabs.addTab("Campaign", self._createCampaignPanel())
+        detail_tabs.addTab("Stats", self._createStatsPanel())
+        detail_tabs.addTab("Log", self._createLogPanel())
+        bottom_split.setRightComponent(detail_tabs)
+        main_split.setBottomComponent(bottom_split)
+        self.add(main_split, BorderLayout.CENTER)
+    
+    def _createControlPanel(self):
+        panel = JPanel(BorderLayout())
+        panel.setBorder(TitledBorder("Encoding Settings"))
+        rows = JPanel()
+        rows.setLayout(BoxLayout(rows, BoxLayout.Y_AXIS))
+        row1 = JPanel(FlowLayout(FlowLayout.LEFT, 10, 5))
+        row1.add(JLabel("Target Host:"))
+        self._host_field = JTextField(20)
+        row1.add(self._host_field)
+        row1.add(JLabel("Port:"))
+        self._port_field = JTextField("80", 5)
+        row1.add(self._port_field)
+        self._https_check = JCheckBox("HTTPS", False)
+        row1.add(self._https_check)
+        row1.add(Box.createHorizontalStrut(20))
+        row1.add(JLabel("Encoding:"))
+        encoding_names = [e[0] for e in ENCODINGS]
+        self._encoding_combo = JComboBox(encoding_names)
+        row1.add(self._encoding_combo)
+        rows.add(row1)
+        row2 = JPanel(FlowLayout(FlowLayout.LEFT, 10, 5))
+        row2.add(JLabel("Content-Type:"))
+        self._content_type_combo = JComboBox(CONTENT_TYPES)
+        self._content_type_combo.setEditable(True)
+        self._content_type_combo.setPreferredSize(Dimension(300, 25))
+        row2.add(self._content_type_combo)
+        self._update_ct_check = JCheckBox("Update Content-Type", True)
+        self._update_cl_check = JCheckBox("Update Content-Length", True)
+        row2.add(self._update_ct_check)
+        row2.add(self._update_cl_check)
+        self._all_ct_check = JCheckBox("All Content-Types", False)
+        self._charset_variants_check = JCheckBox("Charset Variants", False)
+        row2.add(self._all_ct_check)
+        row2.add(self._charset_variants_check)
+        row2.add(JLabel("Fields:"))
+        self._fields_field = JTextField("", 14)
+        self._fields_field.setToolTipText(
+            "Comma-separated body fields to encode, as List Fields prints them "
+            "(e.g. user.name, items[*].q, user[name]; * and ? are wildcards, brackets are "
+            "literal); empty encodes the whole body")
+        row2.add(self._fields_field)
+        list_fields_btn = JButton("List Fields")
+        list_fields_btn.addActionListener(lambda e: self._listFields())
+        row2.add(list_fields_btn)
+        rows.add(row2)
+        row3 = JPanel(FlowLayout(FlowLayout.LEFT, 10, 5))
+        encode_btn = JButton("Encode Request")
+        encode_btn.addActionListener(lambda e: self._doEncode())
+        row3.add(encode_btn)
+        fuzz_btn = JButton("Fuzz All")
+        fuzz_btn.setBackground(Color(255, 200, 100))
+        fuzz_btn.addActionListener(lambda e: self._doFuzzAll())
+        row3.add(fuzz_btn)
+        send_btn = JButton("Send Selected")
+        send_btn.setBackground(Color(100, 200, 255))
+        send_btn.addActionListener(lambda e: self._doSendSelected())
+        row3.add(send_btn)
+        send_all_btn = JButton("Send All Fuzz")
+        send_all_btn.setBackground(Color(100, 255, 100))
+        send_all_btn.addActionListener(lambda e: self._doSendAllFuzz())
+        row3.add(send_all_btn)
+        clear_btn = JButton("Clear")
+        clear_btn.addActionListener(lambda e: self._doClear())
+        row3.add(clear_btn)
+        rows.add(row3)
+        row4 = JPanel(FlowLayout(FlowLayout.LEFT, 10, 5))
+        row4.add(JLabel("Workers:"))
+        self._workers_field = JTextField("4", 3)
+        row4.add(self._workers_field)
+        row4.add(JLabel("Max req/s:"))
+        self._rate_field = JTextField("10", 4)
+        row4.add(self._rate_field)
+        self._pause_btn = JButton("Pause")
+        self._pause_btn.addActionListener(lambda e: self._togglePause())
+        row4.add(self._pause_btn)
+        cancel_btn = JButton("Cancel Queue")
+        cancel_btn.addActionListener(lambda e: self._cancelQueue())
+        row4.add(cancel_btn)
+        self._keep_alive_check = JCheckBox("Keep-Alive", False)
+        self._keep_alive_check.setToolTipText(
+            "Reuse pooled connections per target instead of makeHttpRequest per variant")
+        row4.add(self._keep_alive_check)
+        row4.add(JLabel("Pipeline depth:"))
+        self._pipeline_depth_field = JTextField("1", 3)
+        row4.add(self._pipeline_depth_field)
+        self._dispatch_label = JLabel("Queue: 0")
+        row4.add(self._dispatch_label)
+        rows.add(row4)
+        row5 = JPanel(FlowLayout(FlowLayout.LEFT, 10, 5))
+        self._adaptive_check = JCheckBox("Adaptive Order", False)
+        self._adaptive_check.setToolTipText(
+            "Send promising encoding families first and skip ones that keep getting blocked")
+        row5.add(self._adaptive_check)
+        row5.add(JLabel("Skip family after blocked:"))
+        self._block_threshold_field = JTextField("3", 3)
+        row5.add(self._block_threshold_field)
+        row5.add(JLabel("Stop after bypasses:"))
+        self._max_bypasses_field = JTextField("3", 3)
+        row5.add(self._max_bypasses_field)
+        row5.add(Box.createHorizontalStrut(20))
+        self._cache_check = JCheckBox("Use Cache", False)
+        self._cache_check.setToolTipText(
+            "Reuse stored responses for variants whose bytes and target are unchanged")
+        row5.add(self._cache_check)
+        clear_cache_btn = JButton("Clear Cache")
+        clear_cache_btn.addActionListener(lambda e: self._clearCache())
+        row5.add(clear_cache_btn)
+        row5.add(JLabel("Keep response KB:"))
+        self._keep_response_field = JTextField("4", 4)
+        self._keep_response_field.setToolTipText(
+            "Store only the first KB of each response (empty keeps whole responses); "
+            "status, length, digest and fingerprint always cover the full response")
+        row5.add(self._keep_response_field)
+        row5.add(Box.createHorizontalStrut(20))
+        self._passive_check = JCheckBox("Passive Mode", False)
+        self._passive_check.setToolTipText(
+            "Fuzz new in-scope Proxy/Repeater requests with a body in the background")
+        self._passive_check.addActionListener(lambda e: self._togglePassive())
+        row5.add(self._passive_check)
+        rows.add(row5)
+        panel.add(rows, BorderLayout.CENTER)
+        return panel
+    
+    def _createRequestPanel(self):
+        panel = JPanel(BorderLayout())
+        panel.setBorder(TitledBorder("Full HTTP Request (Editable)"))
+        self._request_area = JTextArea()
+        self._request_area.setFont(Font("Monospaced", Font.PLAIN, 12))
+        self._request_area.setText(
+            "POST /api/test HTTP/1.1\r\n"
+            "Host: example.com\r\n"
+            "Content-Type: application/json\r\n"
+            "Content-Length: 35\r\n"
+            "\r\n"
+            '{"username":"admin","pwd":"test"}'
+        )
+        scroll = JScrollPane(self._request_area)
+        panel.add(scroll, BorderLayout.CENTER)
+        btn_panel = JPanel(FlowLayout(FlowLayout.LEFT))
+        paste_btn = JButton("Paste")
+        paste_btn.addActionListener(lambda e: self._request_area.paste())
+        btn_panel.add(paste_btn)
+        parse_btn = JButton("Parse & Extract")
+        parse_btn.addActionListener(lambda e: self._parseRequest())
+        btn_panel.add(parse_btn)
+        sync_btn = JButton("Sync Body to Editor")
+        sync_btn.addActionListener(lambda e: self._syncBody())
+        btn_panel.add(sync_btn)
+        panel.add(btn_panel, BorderLayout.SOUTH)
+        return panel
+    
+    def _createBodyPanel(self):
+        panel = JPanel(BorderLayout())
+        panel.setBorder(TitledBorder("Request Body (Only this part will be encoded)"))
+        self._body_area = JTextArea()
+        self._body_area.setFont(Font("Monospaced", Font.PLAIN, 12))
+        self._body_area.setLineWrap(True)
+        scroll = JScrollPane(self._body_area)
+        panel.add(scroll, BorderLayout.CENTER)
+        return panel
+    
+    def _createOutputPanel(self):
+        panel = JPanel(BorderLayout())
+        panel.setBorder(TitledBorder("Encoded Request"))
+        self._output_area = JTextArea()
+        self._output_area.setFont(Font("Monospaced", Font.PLAIN, 12))
+        self._output_area.setEditable(False)
+        scroll = JScrollPane(self._output_area)
+        panel.add(scroll, BorderLayout.CENTER)
+        btn_panel = JPanel(FlowLayout(FlowLayout.LEFT))
+        copy_btn = JButton("Copy All")
+        copy_btn.addActionListener(lambda e: self._copyOutput())
+        btn_panel.add(copy_btn)
+        panel.add(btn_panel, BorderLayout.SOUTH)
+        return panel
+    
+    def _createFuzzResultPanel(self):
+        panel = JPanel(BorderLayout())
+        panel.setBorder(TitledBorder("Fuzz Results (Click to view details)"))
+        self._table_model = ResultTableModel(self._pipeline)
+        self._table_updates = TableUpdateCoalescer(self._table_model, self._pipeline.metrics)
+        self._result_table = JTable(self._table_model)
+        self._result_table.setSelectionMode(ListSelectionModel.MULTIPLE_INTERVAL_SELECTION)
+        self._result_table.getSelectionModel().addListSelectionListener(
+            lambda e: self._onResultSelected(e)
+        )
+        class DoubleClickListener(MouseAdapter):
+            def __init__(self, panel):
+                self._panel = panel
+            def mouseClicked(self, e):
+                if e.getClickCount() == 2:
+                    self._panel._doSendSelected()
+        self._result_table.addMouseListener(DoubleClickListener(self))
+        scroll = JScrollPane(self._result_table)
+        panel.add(scroll, BorderLayout.CENTER)
+        toolbar = JPanel(FlowLayout(FlowLayout.LEFT))
+        clear_btn = JButton("Clear Results")
+        clear_btn.addActionListener(lambda e: self._clearResults())
+        toolbar.add(clear_btn)
+        save_btn = JButton("Save Project...")
+        save_btn.addActionListener(lambda e: self._saveProject())
+        toolbar.add(save_btn)
+        open_btn = JButton("Open Project...")
+        open_btn.addActionListener(lambda e: self._openProject())
+        toolbar.add(open_btn)
+        keep_full_btn = JButton("Keep Full Response")
+        keep_full_btn.setToolTipText("Resend the selected rows and store their whole responses")
+        keep_full_btn.addActionListener(lambda e: self._keepFullResponses())
+        toolbar.add(keep_full_btn)
+        export_btn = JButton("Export Results...")
+        export_btn.addActionListener(lambda e: self._exportResults())
+        toolbar.add(export_btn)
+        self._project_label = JLabel("Project: (unsaved)")
+        toolbar.add(self._project_label)
+        panel.add(toolbar, BorderLayout.SOUTH)
+        return panel
+    
+    def _createDetailPanel(self):
+        panel = JPanel(BorderLayout())
+        panel.setBorder(TitledBorder("Selected Fuzz Request Detail"))
+        self._detail_area = JTextArea(6, 40)
+        self._detail_area.setFont(Font("Monospaced", Font.PLAIN, 11))
+        self._detail_area.setEditable(False)
+        self._detail_area.setText("# Click on a row in the Fuzz Results table to view details\n# Double-click to send the request")
+        panel.add(JScrollPane(self._detail_area), BorderLayout.NORTH)
+        self._request_viewer = PagedBytesViewer()
+        self._response_viewer = PagedBytesViewer()
+        content_tabs = JTabbedPane()
+        content_tabs.addTab("Request", self._request_viewer)
+        content_tabs.addTab("Response", self._response_viewer)
+        panel.add(content_tabs, BorderLayout.CENTER)
+        return panel
+    
+    def _createCampaignPanel(self):
+        panel = JPanel(BorderLayout())
+        panel.setBorder(TitledBorder("Endpoints (select to jump to results)"))
+        self._endpoint_model = EndpointTableModel(self._pipeline)
+        self._endpoint_table = JTable(self._endpoint_model)
+        self._endpoint_table.setSelectionMode(ListSelectionModel.SINGLE_SELECTION)
+        self._endpoint_table.getSelectionModel().addListSelectionListener(
+            lambda e: self._onEndpointSelected(e)
+        )
+        panel.add(JScrollPane(self._endpoint_table), BorderLayout.CENTER)
+        self._campaign_label = JLabel("No endpoints")
+        panel.add(self._campaign_label, BorderLayout.SOUTH)
+        return panel
+    
+    def _onEndpointSelected(self, event):
+        if event.getValueIsAdjusting():
+            return
+        row = self._endpoint_table.getSelectedRow()
+        if row < 0:
+            return
+        endpoint = self._endpoint_model.endpoint_at(row)
+        if not endpoint.indices:
+            return
+        result_row = self._table_model.row_of(endpoint.indices[0])
+        if result_row >= 0:
+            self._result_table.setRowSelectionInterval(result_row, result_row)
+            self._result_table.scrollRectToVisible(self._result_table.getCellRect(result_row, 0, True))
+    
+    def _refreshCampaignStatus(self):
+        self._endpoint_model.refresh()
+        endpoints = self._pipeline.endpoints
+        if not endpoints:
+            self._campaign_label.setText("No endpoints")
+            return
+        variants = sum([endpoint.variants for endpoint in endpoints])
+        completed = sum([endpoint.completed for endpoint in endpoints])
+        done = len([endpoint for endpoint in endpoints if endpoint.status == "Done"])
+        self._campaign_label.setText("Endpoints: %d (%d done) | Responses: %d/%d" % (
+            len(endpoints), done, completed, variants))
+    
+    def _createStatsPanel(self):
+        panel = JPanel(BorderLayout())
+        panel.setBorder(TitledBorder("Stage Timings (ns clock, per variant)"))
+        self._stats_model = StatsTableModel(self._pipeline.metrics)
+        panel.add(JScrollPane(JTable(self._stats_model)), BorderLayout.CENTER)
+        btn_panel = JPanel(FlowLayout(FlowLayout.LEFT))
+        self._stats_label = JLabel("")
+        btn_panel.add(self._stats_label)
+        reset_btn = JButton("Reset")
+        reset_btn.addActionListener(lambda e: self._pipeline.metrics.reset())
+        btn_panel.add(reset_btn)
+        csv_btn = JButton("Export CSV")
+        csv_btn.addActionListener(lambda e: self._exportMetrics("csv"))
+        btn_panel.add(csv_btn)
+        json_btn = JButton("Export JSON")
+        json_btn.addActionListener(lambda e: self._exportMetrics("json"))
+        btn_panel.add(json_btn)
+        panel.add(btn_panel, BorderLayout.SOUTH)
+        self._stats_panel = panel
+        return panel
+    
+    def _refreshStats(self):
+        if not self._stats_panel.isShowing():
+            return
+        self._stats_model.refresh()
+        metrics = self._pipeline.metrics
+        self._stats_label.setText("Sent: %.1f/s | Generated: %.1f/s | Screen: %.1f/s" % (
+            metrics.rate("send"), metrics.rate("build"), metrics.rate("ui")))
+    
+    def _exportMetrics(self, kind):
+        chooser = JFileChooser()
+        chooser.setSelectedFile(File("wafbypass-timings.%s" % kind))
+        if chooser.showSaveDialog(self) != JFileChooser.APPROVE_OPTION:
+            return
+        path = chooser.getSelectedFile().getAbsolutePath()
+        metrics = self._pipeline.metrics
+        export = metrics.export_csv if kind == "csv" else metrics.export_json
+        panel = self
+        class ExportRunner(Runnable):
+            def run(self):
+                try:
+                    count = export(path)
+                    panel._log("[+] Exported %d timing samples to %s" % (count, path))
+                except Exception as e:
+                    panel._log("[-] Timing export failed: %s" % str(e), ERROR)
+        Thread(ExportRunner()).start()
+    
+    def _createLogPanel(self):
+        panel = JPanel(BorderLayout())
+        self._log_area = JTextArea()
+        self._log_area.setFont(Font("Monospaced", Font.PLAIN, 11))
+        self._log_area.setEditable(False)
+        scroll = JScrollPane(self._log_area)
+        panel.add(scroll, BorderLayout.CENTER)
+        self._log_sink = LogSink(self._log_area, self._stdout)
+        btn_panel = JPanel(FlowLayout(FlowLayout.LEFT))
+        clear_btn = JButton("Clear Log")
+        clear_btn.addActionListener(lambda e: self._log_sink.clear())
+        btn_panel.add(clear_btn)
+        btn_panel.add(JLabel("Level:"))
+        self._log_level_combo = JComboBox([name for name, _ in LogSink.LEVELS])
+        self._log_level_combo.addActionListener(lambda e: self._setLogLevel())
+        btn_panel.add(self._log_level_combo)
+        panel.add(btn_panel, BorderLayout.SOUTH)
+        return panel
+    
+    def _setLogLevel(self):
+        self._log_sink.level = dict(LogSink.LEVELS)[str(self._log_level_combo.getSelectedItem())]
+    
+    def _log(self, message, level=INFO):
+        self._log_sink.log(message, level)
+    
+    def _parseRequest(self):
+        raw_request = self._request_area.getText()
+        if not raw_request:
+            JOptionPane.showMessageDialog(self, "Please enter a valid HTTP request")
+            return
+        raw_request = raw_request.replace("\r\n", "\n").replace("\n", "\r\n")
+        for line in raw_request.split("\r\n"):
+            if line.lower().startswith("host:"):
+                host_value = line[5:].strip()
+                if ":" in host_value:
+                    parts = host_value.split(":")
+                    self._host_field.setText(parts[0])
+                    self._port_field.setText(parts[1])
+                else:
+                    self._host_field.setText(host_value)
+                break
+        if "\r\n\r\n" in raw_request:
+            body = raw_request.split("\r\n\r\n", 1)[1]
+            self._body_area.setText(body)
+            self._log("[+] Request parsed, body length: %d chars" % len(body))
+        else:
+            self._log("[*] No request body found")
+    
+    def _syncBody(self):
+        raw_request = self._request_area.getText()
+        if "\r\n\r\n" in raw_request:
+            body = raw_request.split("\r\n\r\n", 1)[1]
+            self._body_area.setText(body)
+        elif "\n\n" in raw_request:
+            body = raw_request.split("\n\n", 1)[1]
+            self._body_area.setText(body)
+    
+    def _getContentType(self, encoding):
+        template = str(self._content_type_combo.getSelectedItem())
+        return self._pipeline.content_type(encoding, template)
+    
+    def _fuzzConfig(self):
+        """Snapshot the generation settings; call on the EDT."""
+        if self._all_ct_check.isSelected():
+            templates = list(CONTENT_TYPES)
+            selected = str(self._content_type_combo.getSelectedItem())
+            if selected not in templates:
+                templates.insert(0, selected)
+        else:
+            templates = [str(self._content_type_combo.getSelectedItem())]
+        if self._charset_variants_check.isSelected():
+            styles = CHARSET_STYLES
+        else:
+            styles = ["canonical"]
+        fields = [field.strip() for field in self._fields_field.getText().split(",") if field.strip()]
+        return FuzzConfig(templates, styles, update_ct=self._update_ct_check.isSelected(),
+                          update_cl=self._update_cl_check.isSelected(), fields=fields)
+    
+    def _listFields(self):
+        template = RequestTemplate(self._request_area.getText())
+        regions = index_regions(template.body, template.content_type)
+        if not regions:
+            self._log("[*] No JSON/XML/form/multipart fields found in the request body")
+            return
+        self._log("[*] %d body fields: %s" % (len(regions), ", ".join(
+            ["%s (%d chars)" % (region.name, region.end - region.start) for region in regions])))
+    
+    def _readRequestHead(self):
+        doc = self._request_area.getDocument()
+        head = doc.getText(0, min(doc.getLength(), PREVIEW_BYTES))
+        for separator in ("\r\n\r\n", "\n\n"):
+            if separator in head:
+                return head.split(separator, 1)[0]
+        return head
+    
+    def _iterBodyChunks(self):
+        doc = self._body_area.getDocument()
+        length = doc.getLength()
+        for offset in range(0, length, STREAM_CHUNK_CHARS):
+            yield doc.getText(offset, min(STREAM_CHUNK_CHARS, length - offset))
+    
+    def _formatEncodedPreview(self, encoding, full_request):
+        head_length = full_request.find(b"\r\n\r\n") + 4
+        body_length = len(full_request) - head_length
+        shown = full_request[:head_length + PREVIEW_BYTES]
+        output = "=== Encoded Request (%s) ===\n\n" % encoding
+        output += latin1(shown)
+        if len(full_request) > len(shown):
+            output += "\n\n... [%d more bytes not shown]" % (len(full_request) - len(shown))
+        body_hex = to_hex(full_request[head_length:head_length + HEX_PREVIEW_BYTES])
+        output += "\n\n=== Body Hex ===\n" + body_hex
+        if body_length > HEX_PREVIEW_BYTES:
+            output += "\n... [%d of %d bytes shown]" % (HEX_PREVIEW_BYTES, body_length)
+        return output
+    
+    def _doEncode(self):
+        encoding = str(self._encoding_combo.getSelectedItem())
+        if self._body_area.getDocument().getLength() == 0:
+            self._syncBody()
+            if self._body_area.getDocument().getLength() == 0:
+                JOptionPane.showMessageDialog(self, "Request body is empty")
+                return
+        try:
+            content_type = self._getContentType(encoding)
+            update_ct = self._update_ct_check.isSelected()
+            update_cl = self._update_cl_check.isSelected()
+            fields = self._fuzzConfig().fields
+            head = self._readRequestHead()
+            template = RequestTemplate(head)
+            splicer = None
+            if fields:
+                template = RequestTemplate(head + "\r\n\r\n" + self._body_area.getText())
+                splicer = self._pipeline.splicer(template, fields)
+                if splicer is None:
+                    self._log("[*] No body fields match %s, encoding the whole body" % ", ".join(fields), WARN)
+            if splicer is not None:
+                charset = self._pipeline.engine.get_charset_name(encoding)
+                full_request = self._pipeline.build(template, encoding, content_type,
+                                                    update_ct and not splicer.multipart, update_cl,
+                                                    splicer=splicer, charset=charset)
+            else:
+                full_request = template.render_chunks(
+                    self._pipeline.engine.iter_encode(self._iterBodyChunks(), encoding), content_type,
+                    update_ct, update_cl
+                )
+            self._output_area.setText(self._formatEncodedPreview(encoding, full_request))
+            self._output_area.setCaretPosition(0)
+            self._log("[+] Encoded with %s, length: %d bytes" % (encoding, len(full_request)))
+        except Exception as e:
+            self._log("[-] Encoding failed: %s" % str(e), ERROR)
+            JOptionPane.showMessageDialog(self, "Encoding failed: %s" % str(e))
+    
+    def _doFuzzAll(self):
+        raw_request = self._request_area.getText()
+        if not raw_request:
+            JOptionPane.showMessageDialog(self, "Please enter a valid HTTP request")
+            return
+        template = RequestTemplate(raw_request)
+        body = template.body
+        if not body:
+            JOptionPane.showMessageDialog(self, "Request body is empty")
+            return
+        self._body_area.setText(body)
+        self._parseRequest()
+        self._log("[*] Starting Fuzz All...")
+        self._table_updates.reset()
+        self._table_model.clear()
+        self._pipeline.reset()
+        self._endpoint_model.refresh()
+        # The project's results are gone; never auto-save this run over it.
+        self._setProjectPath(None)
+        if self._passive is not None:
+            self._passive.forget()
+        config = self._fuzzConfig()
+        matrix = config.matrix()
+        self._log("[*] Fuzz matrix: %d combinations on %d generator threads" % (
+            matrix.total, self._pipeline.generators.workers))
+        class FuzzRunner(Runnable):
+            def __init__(self, pipeline, template, matrix, config):
+                self._pipeline = pipeline
+                self._template = template
+                self._matrix = matrix
+                self._config = config
+            def run(self):
+                self._pipeline.generate(self._template, self._matrix,
+                                        self._config.update_ct, self._config.update_cl,
+                                        fields=self._config.fields)
+        Thread(FuzzRunner(self._pipeline, template, matrix, config)).start()
+    
+    def queueCampaign(self, messages):
+        captured = []
+        for message in messages:
+            request = message.getRequest()
+            service = message.getHttpService()
+            if request is None or service is None:
+                continue
+            target = Target(service.getHost(), service.getPort(),
+                            service.getProtocol().lower() == "https")
+            captured.append((request, target))
+        if not captured:
+            self._log("[-] No requests with an HTTP service selected", WARN)
+            return
+        self._applyDispatchSettings()
+        config = self._fuzzConfig()
+        class CampaignRunner(Runnable):
+            def __init__(self, panel, captured, config):
+                self._panel = panel
+                self._captured = captured
+                self._config = config
+            def run(self):
+                pipeline = self._panel._pipeline
+                requests = []
+                for request, target in self._captured:
+                    template = RequestTemplate(latin1(request))
+                    if template.body:
+                        requests.append((template, target))
+                skipped = len(self._captured) - len(requests)
+                if skipped:
+                    self._panel._log("[*] Campaign: skipped %d requests without a body" % skipped)
+                try:
+                    pipeline.run_campaign(requests, self._config)
+                except Exception as e:
+                    self._panel._log("[-] Campaign failed: %s" % str(e), ERROR)
+        Thread(CampaignRunner(self, captured, config)).start()
+    
+    def _getTarget(self):
+        host = self._host_field.getText().strip()
+        if not host:
+            JOptionPane.showMessageDialog(self, "Please enter target host")
+            return None
+        try:
+            port = int(self._port_field.getText().strip())
+        except ValueError:
+            JOptionPane.showMessageDialog(self, "Please enter a valid port")
+            return None
+        return Target(host, port, self._https_check.isSelected())
+    
+    def _applyDispatchSettings(self):
+        try:
+            workers = max(1, int(self._workers_field.getText().strip()))
+        except ValueError:
+            workers = 4
+            self._workers_field.setText(str(workers))
+        try:
+            rate = float(self._rate_field.getText().strip())
+        except ValueError:
+            rate = 10.0
+            self._rate_field.setText("10")
+        self._pipeline.dispatcher.configure(workers, rate)
+        self._applyTransportSettings(workers)
+        self._applySchedulerSettings()
+        self._applyCacheSettings()
+        self._applyRetentionSettings()
+    
+    def _applyRetentionSettings(self):
+        text = self._keep_response_field.getText().strip()
+        if not text:
+            self._pipeline.keep_response_bytes = None
+            return
+        try:
+            self._pipeline.keep_response_bytes = max(0, int(float(text) * 1024))
+        except ValueError:
+            self._pipeline.keep_response_bytes = 4 * 1024
+            self._keep_response_field.setText("4")
+    
+    def _applyCacheSettings(self):
+        if not self._cache_check.isSelected():
+            self._pipeline.cache = None
+            return
+        if self._cache is None:
+            self._cache = VariantCache()
+        self._pipeline.cache = self._cache
+    
+    def _clearCache(self):
+        cache = self._cache or VariantCache()
+        cache.clear()
+        self._log("[*] Response cache cleared (%s)" % cache.directory)
+    
+    def _applySchedulerSettings(self):
+        limits = []
+        for field in (self._block_threshold_field, self._max_bypasses_field):
+            try:
+                limits.append(max(0, int(field.getText().strip())))
+            except ValueError:
+                limits.append(3)
+                field.setText("3")
+        self._pipeline.set_adaptive(self._adaptive_check.isSelected(), limits[0], limits[1])
+    
+    def _applyTransportSettings(self, workers):
+        transport = self._pipeline.transport
+        if not self._keep_alive_check.isSelected():
+            if transport is not self._burp_transport:
+                self._pipeline.transport = self._burp_transport
+                transport.close()
+                self._log("[*] Keep-Alive off, sending through makeHttpRequest")
+            return
+        try:
+            depth = max(1, int(self._pipeline_depth_field.getText().strip()))
+        except ValueError:
+            depth = 1
+            self._pipeline_depth_field.setText("1")
+        if transport is self._burp_transport:
+            self._pipeline.transport = KeepAliveTransport(self._burp_transport,
+                                                          max_connections=workers,
+                                                          pipeline_depth=depth)
+            self._log("[*] Keep-Alive on, pipeline depth %d" % depth)
+        else:
+            transport.configure(workers, depth)
+    
+    def _togglePassive(self):
+        callbacks = self._callbacks
+        if not self._passive_check.isSelected():
+            if self._passive_listener is not None:
+                callbacks.removeHttpListener(self._passive_listener)
+                self._passive_listener = None
+            if self._passive is not None:
+                self._passive.stop()
+            self._log("[*] Passive mode off")
+            return
+        self._applyDispatchSettings()
+        config = self._fuzzConfig()
+        if self._passive is None:
+            self._passive = PassiveExpander(self._pipeline, self._preparePassive, config)
+        self._passive.config = config
+        self._passive.start()
+        self._passive_listener = PassiveListener(
+            self._passive, (callbacks.TOOL_PROXY, callbacks.TOOL_REPEATER))
+        callbacks.registerHttpListener(self._passive_listener)
+        self._log("[*] Passive mode on: new in-scope endpoints with a body are fuzzed in the background")
+    
+    def _preparePassive(self, message):
+        service = message.getHttpService()
+        request = message.getRequest()
+        if service is None or request is None:
+            return None
+        info = self._helpers.analyzeRequest(service, request)
+        if info.getBodyOffset() >= len(request) or not self._callbacks.isInScope(info.getUrl()):
+            return None
+        return (RequestTemplate(latin1(request)),
+                Target(service.getHost(), service.getPort(), service.getProtocol().lower() == "https"))
+    
+    def _togglePause(self):
+        if self._pipeline.dispatcher.is_paused():
+            self._pipeline.dispatcher.resume()
+            self._pause_btn.setText("Pause")
+            self._log("[*] Send queue resumed")
+        else:
+            self._pipeline.dispatcher.pause()
+            self._pause_btn.setText("Resume")
+            self._log("[*] Send queue paused")
+    
+    def _cancelQueue(self):
+        dropped = self._pipeline.dispatcher.cancel()
+        self._log("[*] Send queue cancelled, %d pending requests dropped" % dropped)
+    
+    def _refreshDispatchStatus(self):
+        parts = ["Queue: %d" % self._pipeline.dispatcher.queue_depth()]
+        for worker_id, status in self._pipeline.dispatcher.worker_status():
+            parts.append("W%d: %s" % (worker_id, status))
+        passive = self._passive
+        if passive is not None and passive.running:
+            parts.append("Passive: %d waiting, %d expanded, %d dropped" % (
+                passive.pending, passive.expanded, passive.dropped))
+        self._dispatch_label.setText(" | ".join(parts))
+        self._refreshCampaignStatus()
+        self._refreshStats()
+    
+    def _panelTarget(self, indices):
+        """Host/port fields as a Target, only if some of `indices` need one."""
+        if not self._pipeline.needs_target(indices):
+            return None
+        return self._getTarget() or False
+    
+    def _doSendSelected(self):
+        rows = self._result_table.getSelectedRows()
+        if not rows:
+            JOptionPane.showMessageDialog(self, "Please select a row first")
+            return
+        indices = [self._table_model.index_at(row) for row in rows]
+        target = self._panelTarget(indices)
+        if target is False:
+            return
+        self._applyDispatchSettings()
+        for index in indices:
+            self._pipeline.submit(index, target, use_cache=False)
+    
+    def _keepFullResponses(self):
+        rows = self._result_table.getSelectedRows()
+        if not rows:
+            JOptionPane.showMessageDialog(self, "Please select a row first")
+            return
+        indices = [self._table_model.index_at(row) for row in rows]
+        target = self._panelTarget(indices)
+        if target is False:
+            return
+        self._applyDispatchSettings()
+        self._pipeline.keep_full.update(indices)
+        self._log("[*] Resending %d variants to keep their full responses" % len(indices))
+        for index in indices:
+            self._pipeline.submit(index, target)
+    
+    def _doSendAllFuzz(self):
+        if not self._pipeline.store:
+            JOptionPane.showMessageDialog(self, "Please click 'Fuzz All' first")
+            return
+        indices = [self._table_model.index_at(row) for row in range(self._table_model.getRowCount())]
+        target = self._panelTarget(indices)
+        if target is False:
+            return
+        self._applyDispatchSettings()
+        self._log("[*] Sending all Fuzz requests...")
+        class SubmitRunner(Runnable):
+            def __init__(self, pipeline, target, indices):
+                self._pipeline = pipeline
+                self._target = target
+                self._indices = indices
+            def run(self):
+                self._pipeline.submit_all(self._target, self._indices)
+        Thread(SubmitRunner(self._pipeline, target, indices)).start()
+    
+    def _onResultSelected(self, event):
+        if event.getValueIsAdjusting():
+            return
+        row = self._result_table.getSelectedRow()
+        if row < 0:
+            return
+        index = self._table_model.index_at(row)
+        result = self._pipeline.store.get(index)
+        if result:
+            detail = "=== Fuzz #%d - %s ===\n\n" % (index, result.encoding)
+            detail += "Content-Type: %s\n" % result.content_type
+            detail += "Request Length: %d bytes\n" % result.request_length
+            if result.status_code > 0:
+                detail += "Status Code: %d\n" % result.status_code
+                detail += "Response Length: %d bytes\n" % result.response_length
+                kept = result.response_ref[1] if result.response_ref else 0
+                if kept < result.response_length:
+                    detail += "Response Kept: first %d bytes (Keep Full Response to store all)\n" % kept
+                if result.response_digest:
+                    detail += "Body SHA-256: %s\n" % result.response_digest
+                detail += "Response Time: %d ms\n" % result.response_time
+                if result.connect_time is not None:
+                    detail += "Connect Time: %d ms\n" % result.connect_time
+                if result.ttfb is not None:
+                    detail += "Time to First Byte: %d ms\n" % result.ttfb
+            if result.endpoint:
+                detail += "Endpoint: E%d %s\n" % (result.endpoint.id, result.endpoint.label)
+            if result.cluster:
+                detail += "Cluster: C%d (%s)\n" % (result.cluster, self._pipeline.verdict(index, result))
+            self._detail_area.setText(detail)
+            self._detail_area.setCaretPosition(0)
+            self._showBlob(self._request_viewer, result.request_ref)
+            self._showBlob(self._response_viewer, result.response_ref)
+    
+    def _showBlob(self, viewer, ref):
+        if ref is None:
+            viewer.setSource(0, None)
+            return
+        store = self._pipeline.store
+        viewer.setSource(ref[1], lambda offset, size: store.read(ref, offset, size))
+    
+    def _doClear(self):
+        self._request_area.setText("")
+        self._body_area.setText("")
+        self._output_area.setText("")
+        self._detail_area.setText("")
+        self._request_viewer.setData(None)
+        self._response_viewer.setData(None)
+        self._table_updates.reset()
+        self._table_model.clear()
+        self._pipeline.reset()
+        self._endpoint_model.refresh()
+        self._setProjectPath(None)
+        if self._passive is not None:
+            self._passive.forget()
+        self._log_sink.clear()
+    
+    def _clearResults(self):
+        self._table_updates.reset()
+        self._table_model.clear()
+        self._pipeline.reset()
+        self._endpoint_model.refresh()
+        self._setProjectPath(None)
+        if self._passive is not None:
+            self._passive.forget()
+        self._detail_area.setText("")
+        self._request_viewer.setData(None)
+        self._response_viewer.setData(None)
+    
+    def _setProjectPath(self, path):
+        self._project_path = path
+        self._callbacks.saveExtensionSetting("project_path", path)
+        label = "Project: %s" % (os.path.basename(path) if path else "(unsaved)")
+        SwingUtilities.invokeLater(lambda: self._project_label.setText(label))
+    
+    def _chooseProjectFile(self, save):
+        chooser = JFileChooser()
+        chooser.setSelectedFile(File(self._project_path or "waf-bypass.wbp"))
+        choice = chooser.showSaveDialog(self) if save else chooser.showOpenDialog(self)
+        if choice != JFileChooser.APPROVE_OPTION:
+            return None
+        return chooser.getSelectedFile().getAbsolutePath()
+    
+    def _saveProject(self):
+        if not self._pipeline.dispatcher.wait_idle(0):
+            self._log("[-] Wait for the send queue to drain (or cancel it) before saving", WARN)
+            return
+        if self._passive is not None and self._passive.running:
+            self._log("[-] Turn off Passive Mode before saving", WARN)
+            return
+        path = self._chooseProjectFile(True)
+        if path is None:
+            return
+        panel = self
+        class SaveRunner(Runnable):
+            def run(self):
+                if not panel._save_lock.acquire(False):
+                    panel._log("[-] A save is already in progress", WARN)
+                    return
+                try:
+                    panel._pipeline.save_project(path)
+                    panel._setProjectPath(path)
+                except Exception as e:
+                    panel._log("[-] Saving project failed: %s" % str(e), ERROR)
+                finally:
+                    panel._save_lock.release()
+        Thread(SaveRunner()).start()
+    
+    def _openProject(self, path=None):
+        if path is None:
+            path = self._chooseProjectFile(False)
+            if path is None:
+                return
+        self._table_updates.reset()
+        self._table_model.clear()
+        self._detail_area.setText("")
+        self._request_viewer.setData(None)
+        self._response_viewer.setData(None)
+        panel = self
+        class OpenRunner(Runnable):
+            def run(self):
+                try:
+                    panel._pipeline.open_project(path)
+                    panel._setProjectPath(path)
+                    # Passively expanded endpoints were replaced by the project's.
+                    if panel._passive is not None:
+                        panel._passive.forget()
+                except Exception as e:
+                    panel._log("[-] Opening project failed: %s" % str(e), ERROR)
+        Thread(OpenRunner()).start()
+    
+    def _exportResults(self):
+        total = len(self._pipeline.store)
+        if not total:
+            self._log("[-] No results to export", WARN)
+            return
+        chooser = JFileChooser()
+        filters = [FileNameExtensionFilter("CSV report (*.csv)", ["csv"]),
+                   FileNameExtensionFilter("JSON Lines report (*.jsonl)", ["jsonl"]),
+                   FileNameExtensionFilter("Binary archive with bytes (*.gz)", ["gz"])]
+        for name_filter in filters:
+            chooser.addChoosableFileFilter(name_filter)
+        chooser.setFileFilter(filters[0])
+        chooser.setSelectedFile(File("wafbypass-results.csv"))
+        if chooser.showSaveDialog(self) != JFileChooser.APPROVE_OPTION:
+            return
+        path = chooser.getSelectedFile().getAbsolutePath()
+        fmt = export_format(path)
+        if fmt is None:
+            suffix = {filters[1]: ".jsonl", filters[2]: ".wbx.gz"}.get(chooser.getFileFilter(), ".csv")
+            path += suffix
+            fmt = export_format(path)
+        monitor = ProgressMonitor(self, "Exporting results to %s" % os.path.basename(path),
+                                  "", 0, total)
+        monitor.setMillisToDecideToPopup(250)
+        def progress(done, total):
+            note = "%d / %d" % (done, total)
+            def update():
+                monitor.setMaximum(total)
+                monitor.setProgress(done)
+                monitor.setNote(note)
+            SwingUtilities.invokeLater(update)
+            return not monitor.isCanceled()
+        panel = self
+        class ExportRunner(Runnable):
+            def run(self):
+                try:
+                    count = export_results(panel._pipeline, path, fmt, progress)
+                    if count is None:
+                        panel._log("[*] Export to %s cancelled" % path, WARN)
+                    else:
+                        panel._log("[+] Exported %d results to %s" % (count, path))
+                except Exception as e:
+                    panel._log("[-] Result export failed: %s" % str(e), ERROR)
+                finally:
+                    SwingUtilities.invokeLater(monitor.close)
+        Thread(ExportRunner()).start()
+    
+    def shutdown(self):
+        if self._passive_listener is not None:
+            self._callbacks.removeHttpListener(self._passive_listener)
+        if self._passive is not None:
+            self._passive.stop()
+        self._dispatch_timer.stop()
+        self._table_updates.stop()
+        self._log_sink.stop()
+        if self._project_path and len(self._pipeline.store):
+            # Variants still queued are saved unsent, as "Ready" rows.
+            self._pipeline.dispatcher.cancel()
+            self._pipeline.dispatcher.wait_idle(10)
+            with self._save_lock:
+                try:
+                    self._pipeline.save_project(self._project_path)
+                    self._stdout.println("[*] Project saved to %s" % self._project_path)
+                except Exception as e:
+                    self._stdout.println("[-] Saving project failed: %s" % str(e))
+        self._pipeline.close()
+    
+    def _copyOutput(self):
+        self._output_area.selectAll()
+        self._output_area.copy()
+    
+    def receiveRequest(self, message):
+        """Load one request from a Burp context menu into the request editor."""
+        request = message.getRequest()
+        http_service = message.getHttpService()
+        if not request:
+            return
+        self._current_request = request
+        self._current_http_service = http_service
+        if http_service:
+            self._host_field.setText(http_service.getHost())
+            self._port_field.setText(str(http_service.getPort()))
+            self._https_check.setSelected(http_service.getProtocol().lower() == "https")
+        self._request_area.setText(latin1(request))
+        self._body_area.setText("")
+        self._output_area.setText("")
+        self._log("[+] Received full request, length: %d bytes" % len(request))
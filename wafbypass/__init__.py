@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""Headless core of the WAF Bypass Encoder.
+
+Everything here runs under Jython inside Burp and under plain CPython;
+waf_bypass_burp.py is a thin Swing/Burp adapter on top of this package.
+"""
+from .byteutils import as_bytes, digest, hexdump, latin1, to_bytes, to_hex
+from .cache import VariantCache, default_cache_dir
+from .campaign import Endpoint
+from .dispatch import FifoQueue, SendDispatcher, SendJob, TokenBucket
+from .encoding import (CHARSET_STYLES, CONTENT_TYPES, ENCODINGS, STREAM_CHUNK_CHARS,
+                       EncodingEngine, iter_text_chunks)
+from .export import EXPORT_FORMATS, export_format, export_results, iter_binary_export
+from .fingerprint import ResponseClusterer, ResponseFingerprint
+from .matrix import FuzzConfig, FuzzMatrix, build_matrix
+from .metrics import STAGES, Histogram, MetricsRegistry, clock
+from .parallel import WorkerPool, cpu_count
+from .passive import PassiveExpander, endpoint_signature
+from .pipeline import DEBUG, ERROR, INFO, WARN, FuzzPipeline, PipelineListener
+from .project import ProjectFormatError, read_index
+from .regions import Region, RegionSplicer, index_regions, select_regions
+from .results import BlobStore, FuzzResult, ResultStore
+from .scheduler import AdaptiveScheduler
+from .template import RequestTemplate
+from .transport import (KeepAliveTransport, SocketTransport, Target, Transport,
+                        read_http_response)
+
+__version__ = "1.0"
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""Conversions between Python byte strings, text and Java byte arrays.
+
+Java byte[] buffers from Burp are converted with bulk JDK calls
+(String(byte[], ISO_8859_1), HexFormat / DatatypeConverter, MessageDigest)
+instead of iterating them from Python; Python byte strings go through the
+equivalent C/Java-backed stdlib functions.
+"""
+import binascii
+import hashlib
+
+try:
+    from java.lang import String
+    from java.nio.charset import StandardCharsets
+    from java.security import MessageDigest
+except ImportError:
+    String = None
+
+_java_hex = None
+if String is not None:
+    try:
+        from java.util import HexFormat
+
+        _java_hex = HexFormat.of().formatHex
+    except ImportError:
+        try:
+            from javax.xml.bind import DatatypeConverter
+
+            _java_hex = lambda data: DatatypeConverter.printHexBinary(data).lower()
+        except ImportError:
+            pass
+
+_JAVA_DIGESTS = {"md5": "MD5", "sha1": "SHA-1", "sha256": "SHA-256"}
+
+_SPACED_HEX = [u"%02x " % i for i in range(256)]
+
+_NON_PRINTABLE = dict((i, u".") for i in list(range(32)) + list(range(127, 256)))
+
+
+def _is_java_array(data):
+    return not isinstance(data, (bytes, bytearray)) and hasattr(data, "tostring")
+
+
+def as_bytes(data):
+    if isinstance(data, bytes):
+        return data
+    return data.encode("iso-8859-1")
+
+
+def to_bytes(data):
+    if isinstance(data, bytes):
+        return data
+    if isinstance(data, bytearray):
+        return bytes(data)
+    if hasattr(data, "tostring"):
+        return data.tostring()
+    return bytes(data)
+
+
+def latin1(data):
+    """Decode bytes or a Java byte[] to text, one code point per byte."""
+    if String is not None and _is_java_array(data):
+        return String(data, StandardCharsets.ISO_8859_1)
+    return to_bytes(data).decode("iso-8859-1")
+
+
+def to_hex(data):
+    """Lower-case hex string of bytes or a Java byte[]."""
+    if _java_hex is not None and _is_java_array(data):
+        return _java_hex(data)
+    return binascii.hexlify(to_bytes(data)).decode("ascii")
+
+
+def digest(data, algorithm="md5", prefix=None):
+    """Raw digest of `prefix` + `data`; a Java byte[] is hashed in place."""
+    if String is not None and _is_java_array(data):
+        md = MessageDigest.getInstance(_JAVA_DIGESTS.get(algorithm, algorithm.upper()))
+        if prefix:
+            md.update(to_bytes(prefix))
+        return md.digest(data).tostring()
+    h = hashlib.new(algorithm)
+    if prefix:
+        h.update(prefix)
+    h.update(to_bytes(data))
+    return h.digest()
+
+
+def _spaced_hex(data):
+    try:
+        return binascii.hexlify(data, b" ").decode("ascii")
+    except TypeError:
+        # No separator argument before Python 3.8 (or in Jython): map a
+        # lookup table over the buffer, which still iterates in C/Java.
+        return u"".join(map(_SPACED_HEX.__getitem__, bytearray(data)))
+
+
+def hexdump(data, base=0, width=16):
+    """Classic offset / hex / ASCII dump, converted in one pass per buffer."""
+    data = to_bytes(data)
+    spaced = _spaced_hex(data)
+    text = latin1(data).translate(_NON_PRINTABLE)
+    row_width = width * 3 - 1
+    return u"\n".join([u"%08x  %-*s  |%s|" % (base + i, row_width, spaced[3 * i:3 * (i + width) - 1],
+                                                text[i:i + width])
+                       for i in range(0, len(data), width)])
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""Persistent, content-addressed cache of responses per (target, request)."""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from .byteutils import digest, to_hex
+
+
+def default_cache_dir():
+    return os.path.join(os.path.expanduser("~"), ".wafbypass", "cache")
+
+
+class CachedResponse(object):
+    __slots__ = ("response", "response_time", "connect_time", "ttfb", "stored_at")
+
+    def __init__(self, response, meta):
+        self.response = response
+        self.response_time = meta.get("response_time", 0)
+        self.connect_time = meta.get("connect_time")
+        self.ttfb = meta.get("ttfb")
+        self.stored_at = meta.get("stored_at", 0)
+
+
+class VariantCache(object):
+    """Size-capped on-disk response cache keyed by a hash of target + request bytes.
+
+    A rendered variant is a pure function of the template headers, body,
+    encoding, Content-Type and CT/CL flags, so hashing its bytes addresses
+    exactly those inputs. Each entry is one file (a JSON metadata line then
+    the raw response); recency is the file mtime, so the LRU order survives
+    restarts and is rebuilt by one directory scan on first use.
+    """
+
+    def __init__(self, directory=None, max_bytes=256 * 1024 * 1024):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = None
+        self._total = 0
+
+    @staticmethod
+    def key(target, request):
+        prefix = ("%s:%d:%d\n" % (target.host, target.port,
+                                   int(bool(target.use_https)))).encode("utf-8")
+        return to_hex(digest(request, "sha1", prefix))
+
+    def get(self, key):
+        with self._lock:
+            self._load()
+            if key not in self._entries:
+                return None
+            self._entries[key] = self._entries.pop(key)
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                meta = json.loads(f.readline().decode("utf-8"))
+                response = f.read()
+            os.utime(path, None)
+        except (IOError, OSError, ValueError):
+            self._forget(key)
+            return None
+        return CachedResponse(response, meta)
+
+    def put(self, key, response, response_time=0, connect_time=None, ttfb=None):
+        meta = json.dumps({"response_time": response_time, "connect_time": connect_time,
+                           "ttfb": ttfb, "stored_at": int(time.time())}).encode("utf-8")
+        path = self._path(key)
+        temp = "%s.%d.tmp" % (path, threading.current_thread().ident or 0)
+        try:
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            with open(temp, "wb") as f:
+                f.write(meta + b"\n")
+                f.write(response)
+            if os.path.exists(path):
+                os.remove(path)
+            os.rename(temp, path)
+        except (IOError, OSError):
+            return False
+        size = len(meta) + 1 + len(response)
+        with self._lock:
+            self._load()
+            self._total += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            evicted = self._evict()
+        for old in evicted:
+            self._remove(old)
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._load()
+            keys = list(self._entries)
+            self._entries.clear()
+            self._total = 0
+        for key in keys:
+            self._remove(key)
+
+    def __len__(self):
+        with self._lock:
+            self._load()
+            return len(self._entries)
+
+    @property
+    def size(self):
+        return self._total
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def _load(self):
+        if self._entries is not None:
+            return
+        found = []
+        if os.path.isdir(self.directory):
+            for shard in os.listdir(self.directory):
+                shard_dir = os.path.join(self.directory, shard)
+                if not os.path.isdir(shard_dir):
+                    continue
+                for name in os.listdir(shard_dir):
+                    if name.endswith(".tmp"):
+                        continue
+                    try:
+                        stat = os.stat(os.path.join(shard_dir, name))
+                    except OSError:
+                        continue
+                    found.append((stat.st_mtime, name, stat.st_size))
+        found.sort()
+        self._entries = OrderedDict((name, size) for _, name, size in found)
+        self._total = sum([size for _, _, size in found])
+        evicted = self._evict()
+        for key in evicted:
+            self._remove(key)
+
+    def _evict(self):
+        evicted = []
+        while self._total > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self._total -= size
+            evicted.append(key)
+        return evicted
+
+    def _forget(self, key):
+        with self._lock:
+            self._total -= self._entries.pop(key, 0)
+
+    def _remove(self, key):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
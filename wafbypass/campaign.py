@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""Endpoints under test: one compiled request, its target and progress."""
+import threading
+
+from .fingerprint import ResponseClusterer
+
+
+class Endpoint(object):
+    """A request being fuzzed, with its own target and baseline clusters.
+
+    Single-request runs use one endpoint whose target is None (the panel's
+    host/port fields supply it at send time); campaigns create one endpoint
+    per selected message, each carrying the target it was captured from.
+    """
+
+    def __init__(self, endpoint_id, template, target=None):
+        self.id = endpoint_id
+        self.template = template
+        self.target = target
+        self.clusters = ResponseClusterer()
+        self.baseline_index = None
+        self.indices = []
+        self.generating = True
+        self._responses = {}
+        self._lock = threading.Lock()
+
+    @property
+    def label(self):
+        request_line = self.template.headers[0].split(" ") if self.template.headers else []
+        method = request_line[0] if request_line else "?"
+        path = request_line[1] if len(request_line) > 1 else "/"
+        host = self.target.host if self.target else ""
+        for line in self.template.headers[1:]:
+            if line[:5].lower() == "host:":
+                host = line[5:].strip()
+                break
+        return "%s %s%s" % (method, host, path)
+
+    @property
+    def variants(self):
+        return len(self.indices)
+
+    @property
+    def completed(self):
+        return len(self._responses)
+
+    @property
+    def differs(self):
+        with self._lock:
+            clusters = list(self._responses.values())
+        return len([c for c in clusters if self.clusters.verdict(c) == "DIFFERS"])
+
+    @property
+    def status(self):
+        if self.generating:
+            return "Generating"
+        if self.completed >= self.variants:
+            return "Done" if self.variants else "Empty"
+        return "Sending" if self.completed else "Queued"
+
+    def record(self, index, cluster):
+        with self._lock:
+            self._responses[index] = cluster
+
+    def recorded(self, index):
+        return index in self._responses
+
+    def verdict(self, index, cluster):
+        if index == self.baseline_index:
+            return "Baseline"
+        return self.clusters.verdict(cluster)
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""Rate-limited worker pool used to send fuzz variants."""
+import threading
+import time
+from collections import deque, namedtuple
+
+SendJob = namedtuple("SendJob", ["generation", "label", "func", "args", "key"])
+
+
+class TokenBucket(object):
+    """Requests-per-second cap shared by all sender workers (rate <= 0 means unlimited)."""
+
+    def __init__(self, rate, burst=1):
+        self._lock = threading.Lock()
+        self.set_rate(rate, burst)
+
+    def set_rate(self, rate, burst=1):
+        with self._lock:
+            self._rate = float(rate)
+            self._capacity = max(1.0, float(burst))
+            self._tokens = self._capacity
+            self._stamp = time.time()
+
+    def acquire(self, should_abort=None):
+        while True:
+            with self._lock:
+                if self._rate <= 0:
+                    return True
+                now = time.time()
+                self._tokens = min(self._capacity,
+                                   self._tokens + (now - self._stamp) * self._rate)
+                self._stamp = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return True
+                wait = (1.0 - self._tokens) / self._rate
+            if should_abort is not None and should_abort():
+                return False
+            time.sleep(min(wait, 0.1))
+
+
+class FifoQueue(object):
+    """Default dispatcher queue: jobs are sent in submission order.
+
+    A dispatcher queue implements push/pop/drain/clear/__len__; pop() may
+    return None while jobs are held back, and the queue then calls the
+    dispatcher's wake() once they become eligible.
+    """
+
+    def __init__(self):
+        self._jobs = deque()
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def push(self, job):
+        self._jobs.append(job)
+
+    def pop(self):
+        return self._jobs.popleft() if self._jobs else None
+
+    def drain(self):
+        jobs = list(self._jobs)
+        self._jobs.clear()
+        return jobs
+
+    def clear(self):
+        return len(self.drain())
+
+
+class SendDispatcher(object):
+    """Bounded worker pool that sends queued jobs under a TokenBucket rate cap.
+
+    Jobs are plain callables. cancel() drops everything still queued and makes
+    workers that are waiting for a token give up; pause() holds the queue.
+    The queue itself is pluggable (see FifoQueue) so it can be reordered.
+    """
+
+    def __init__(self, workers=4, rate=10.0, on_idle=None, on_error=None):
+        self._cond = threading.Condition()
+        self._jobs = FifoQueue()
+        self._bucket = TokenBucket(rate)
+        self._size = max(1, int(workers))
+        self._threads = {}
+        self._status = {}
+        self._active = 0
+        self._paused = False
+        self._generation = 0
+        self._on_idle = on_idle
+        self._on_error = on_error
+
+    def configure(self, workers, rate):
+        with self._cond:
+            self._size = max(1, int(workers))
+            self._ensure_workers()
+            self._cond.notify_all()
+        self._bucket.set_rate(rate)
+
+    def submit(self, label, func, *args, **options):
+        """Queue func(*args); options["key"] is handed to the queue as job.key."""
+        with self._cond:
+            self._jobs.push(SendJob(self._generation, label, func, args, options.get("key")))
+            self._ensure_workers()
+            self._cond.notify()
+
+    def set_queue(self, queue):
+        """Swap the job queue, carrying pending jobs over."""
+        with self._cond:
+            for job in self._jobs.drain():
+                queue.push(job)
+            self._jobs = queue
+            self._cond.notify_all()
+
+    def wake(self):
+        with self._cond:
+            self._cond.notify_all()
+
+    def pause(self):
+        with self._cond:
+            self._paused = True
+
+    def resume(self):
+        with self._cond:
+            self._paused = False
+            self._cond.notify_all()
+
+    def is_paused(self):
+        return self._paused
+
+    def cancel(self):
+        with self._cond:
+            dropped = self._jobs.clear()
+            self._generation += 1
+            self._cond.notify_all()
+        return dropped
+
+    def wait_idle(self, timeout=None):
+        """Block until the queue is empty and no job is running."""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while len(self._jobs) or self._active:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def queue_depth(self):
+        return len(self._jobs)
+
+    def worker_status(self):
+        with self._cond:
+            return [(i + 1, self._status.get(i, "idle")) for i in sorted(self._threads)]
+
+    def _ensure_workers(self):
+        for worker_id in range(self._size):
+            thread = self._threads.get(worker_id)
+            if thread is None or not thread.is_alive():
+                thread = threading.Thread(target=self._work, args=(worker_id,),
+                                          name="waf-bypass-sender-%d" % (worker_id + 1))
+                thread.daemon = True
+                self._threads[worker_id] = thread
+                thread.start()
+
+    def _work(self, worker_id):
+        while True:
+            with self._cond:
+                job = None
+                while worker_id < self._size:
+                    if not self._paused:
+                        job = self._jobs.pop()
+                        if job is not None:
+                            break
+                    self._status[worker_id] = "paused" if self._paused else "idle"
+                    self._cond.wait()
+                if job is None:
+                    self._status.pop(worker_id, None)
+                    self._threads.pop(worker_id, None)
+                    return
+                generation, label, func, args = job[:4]
+                self._status[worker_id] = "waiting " + label
+                self._active += 1
+            try:
+                if self._bucket.acquire(lambda: generation != self._generation):
+                    self._status[worker_id] = label
+                    func(*args)
+            except Exception as e:
+                if self._on_error:
+                    self._on_error("[-] %s failed: %s" % (label, str(e)))
+            with self._cond:
+                self._active -= 1
+                self._status[worker_id] = "idle"
+                idle = not len(self._jobs) and self._active == 0
+                if idle:
+                    self._cond.notify_all()
+            if idle and self._on_idle:
+                self._on_idle()
@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+"""Encoding registry and the encoding / Content-Type tables the fuzzer iterates."""
+import codecs
+import threading
+from collections import OrderedDict
+
+from .transcode import transcoder_for
+
+try:
+    import jarray
+    from java.lang import String
+    from java.nio import CharBuffer
+    from java.nio.charset import Charset
+except ImportError:
+    Charset = None
+
+ENCODINGS = [
+    ("IBM037", "EBCDIC"),
+    ("IBM500", "EBCDIC"),
+    ("IBM1026", "EBCDIC"),
+    ("UTF-16", "Unicode"),
+    ("UTF-16BE", "Unicode"),
+    ("UTF-16LE", "Unicode"),
+    ("UTF-32", "Unicode"),
+    ("UTF-32BE", "Unicode"),
+    ("UTF-32LE", "Unicode"),
+    ("ISO-8859-1", "ISO"),
+    ("ISO-8859-15", "ISO"),
+    ("Windows-1252", "Windows"),
+]
+
+CONTENT_TYPES = [
+    "text/xml; charset={encoding}",
+    "application/xml; charset={encoding}",
+    "application/json; charset={encoding}",
+    "application/x-www-form-urlencoded; charset={encoding}",
+    "text/plain; charset={encoding}",
+    "application/octet-stream",
+]
+
+CHARSET_STYLES = ["canonical", "upper", "codec", "quoted"]
+
+STREAM_CHUNK_CHARS = 64 * 1024
+
+
+class _JavaCharsetCodec(object):
+    """Codec-like wrapper for charsets only the JVM knows about.
+
+    Chunks are encoded independently, which is exact for the stateless
+    charsets this fallback is used for.
+    """
+
+    def __init__(self, charset):
+        self._charset = charset
+
+    def encode(self, data, errors="strict"):
+        out = self._charset.newEncoder().encode(CharBuffer.wrap(String(data)))
+        buf = jarray.zeros(out.remaining(), "b")
+        out.get(buf)
+        return buf.tostring(), len(data)
+
+    def incrementalencoder(self, errors="strict"):
+        codec = self
+
+        class IncrementalEncoder(object):
+            def encode(self, data, final=False):
+                return codec.encode(data)[0] if data else b""
+        return IncrementalEncoder()
+
+
+def iter_text_chunks(text, chunk_chars=STREAM_CHUNK_CHARS):
+    for offset in range(0, len(text), chunk_chars):
+        yield text[offset:offset + chunk_chars]
+
+
+class EncodingEngine(object):
+    """Registry of encoders with a bounded LRU of recent results.
+
+    Encoding names are normalised and mapped to Python codec encode
+    functions the first time they are used (or all at once with
+    preload=True); names Python does not know fall back to a Java Charset.
+    Results are cached by (body hash, length, encoding) so re-encoding the
+    same body from Encode Request and Fuzz All costs a dictionary lookup.
+    Single-byte charsets are translated from one cached Latin-1 encode
+    through the tables in transcode.py; UTF-16/32 keep their native codecs.
+    """
+
+    CODEC_NAMES = {
+        "IBM037": "cp037",
+        "CP037": "cp037",
+        "IBM500": "cp500",
+        "CP500": "cp500",
+        "IBM1026": "cp1026",
+        "CP1026": "cp1026",
+        "UTF16": "utf-16",
+        "UTF16BE": "utf-16-be",
+        "UTF16LE": "utf-16-le",
+        "UTF32": "utf-32",
+        "UTF32BE": "utf-32-be",
+        "UTF32LE": "utf-32-le",
+        "ISO88591": "iso-8859-1",
+        "LATIN1": "iso-8859-1",
+        "ISO885915": "iso-8859-15",
+        "WINDOWS1252": "windows-1252",
+        "CP1252": "windows-1252",
+    }
+
+    def __init__(self, cache_entries=64, cache_bytes=64 * 1024 * 1024, use_tables=True,
+                 preload=False):
+        self._codecs = {}
+        self._transcoders = {}
+        self._use_tables = use_tables
+        self._cache = OrderedDict()
+        self._cache_entries = cache_entries
+        self._cache_limit = cache_bytes
+        self._cache_size = 0
+        self._lock = threading.Lock()
+        if preload:
+            self.preload()
+
+    def preload(self):
+        """Resolve every known codec and build its translate table now."""
+        for name in self.CODEC_NAMES:
+            self.get_codec(name)
+
+    @staticmethod
+    def normalize(encoding):
+        return encoding.upper().replace("-", "").replace("_", "")
+
+    def get_codec(self, encoding):
+        key = self.normalize(encoding)
+        codec = self._codecs.get(key)
+        if codec is None:
+            name = self.CODEC_NAMES.get(key, encoding)
+            try:
+                codec = codecs.lookup(name)
+            except LookupError:
+                if Charset is None:
+                    raise Exception("Encoding error: unknown encoding: %s" % encoding)
+                try:
+                    codec = _JavaCharsetCodec(Charset.forName(encoding))
+                except Exception:
+                    raise Exception("Encoding error: unknown encoding: %s" % encoding)
+            if self._use_tables and key in self.CODEC_NAMES:
+                self._transcoders[key] = transcoder_for(name)
+            self._codecs[key] = codec
+        return codec
+
+    def get_encoder(self, encoding):
+        return self.get_codec(encoding).encode
+
+    def encode(self, data, encoding):
+        encoder = self.get_encoder(encoding)
+        normalized = self.normalize(encoding)
+        key = (hash(data), len(data), normalized)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] == data:
+                del self._cache[key]
+                self._cache[key] = entry
+                return entry[1]
+        encoded = self._transcode(data, normalized)
+        if encoded is None:
+            try:
+                encoded = encoder(data)[0]
+            except Exception as e:
+                raise Exception("Encoding error: %s" % str(e))
+        self._remember(key, data, encoded)
+        return encoded
+
+    def _transcode(self, data, key):
+        transcoder = self._transcoders.get(key)
+        if transcoder is None:
+            return None
+        try:
+            base = self.encode(data, transcoder.base)
+        except Exception:
+            return None
+        return transcoder.apply(base)
+
+    def iter_encode(self, chunks, encoding):
+        """Encode an iterable of text chunks, yielding encoded byte chunks.
+
+        Table-backed charsets are stateless and translated chunk by chunk;
+        the rest use the codec's incremental encoder so stateful encodings
+        (BOM, byte order) come out identical to a one-shot encode().
+        """
+        codec = self.get_codec(encoding)
+        transcoder = self._transcoders.get(self.normalize(encoding))
+        if transcoder is not None:
+            return self._iter_transcode(chunks, codec, transcoder)
+        return self._iter_codec(chunks, codec)
+
+    def _iter_transcode(self, chunks, codec, transcoder):
+        base_encode = self.get_encoder(transcoder.base)
+        try:
+            for chunk in chunks:
+                try:
+                    encoded = transcoder.apply(base_encode(chunk)[0])
+                except UnicodeError:
+                    encoded = None
+                if encoded is None:
+                    # Outside the table's range: the codec encodes the chunk
+                    # itself, or raises its own error.
+                    encoded = codec.encode(chunk)[0]
+                if encoded:
+                    yield encoded
+        except UnicodeError as e:
+            raise Exception("Encoding error: %s" % str(e))
+
+    def _iter_codec(self, chunks, codec):
+        encoder = codec.incrementalencoder()
+        try:
+            for chunk in chunks:
+                encoded = encoder.encode(chunk)
+                if encoded:
+                    yield encoded
+            encoded = encoder.encode(u"", True)
+            if encoded:
+                yield encoded
+        except UnicodeError as e:
+            raise Exception("Encoding error: %s" % str(e))
+
+    def encode_many(self, data, encodings, on_error=None):
+        results = OrderedDict()
+        for encoding in encodings:
+            try:
+                results[encoding] = self.encode(data, encoding)
+            except Exception as e:
+                if on_error:
+                    on_error(encoding, e)
+        return results
+
+    def _remember(self, key, data, encoded):
+        size = len(encoded)
+        if size > self._cache_limit // 4:
+            return
+        with self._lock:
+            if key in self._cache:
+                return
+            self._cache[key] = (data, encoded)
+            self._cache_size += size
+            while self._cache and (len(self._cache) > self._cache_entries
+                                   or self._cache_size > self._cache_limit):
+                _, (_, evicted) = self._cache.popitem(last=False)
+                self._cache_size -= len(evicted)
+    
+    @staticmethod
+    def get_charset_name(encoding, style="canonical"):
+        encoding_map = {
+            "IBM037": "ibm037",
+            "IBM500": "ibm500",
+            "IBM1026": "ibm1026",
+            "UTF-16": "utf-16",
+            "UTF-16BE": "utf-16be",
+            "UTF-16LE": "utf-16le",
+            "UTF-32": "utf-32",
+            "UTF-32BE": "utf-32be",
+            "UTF-32LE": "utf-32le",
+            "ISO-8859-1": "iso-8859-1",
+            "ISO-8859-15": "iso-8859-15",
+            "Windows-1252": "windows-1252",
+        }
+        charset = encoding_map.get(encoding, encoding.lower())
+        if style == "upper":
+            return charset.upper()
+        if style == "codec":
+            try:
+                return codecs.lookup(charset).name
+            except LookupError:
+                return charset
+        if style == "quoted":
+            return '"%s"' % charset
+        return charset
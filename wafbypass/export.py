@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""Streaming result reports: CSV, JSON Lines and a compact binary archive.
+
+Results are written one at a time straight from the ResultStore, so memory
+stays flat however many variants a campaign has. The binary format is a
+gzip stream of::
+
+    EXPORT_MAGIC
+    repeated: 4-byte big-endian length, UTF-8 JSON row,
+              8-byte length, request bytes, 8-byte length, response bytes
+
+An absent response is written with length 0; a response the pipeline
+kept only a prefix of is shorter than the row's response_length.
+"""
+import csv
+import gzip
+import json
+import os
+import struct
+
+EXPORT_MAGIC = b"WBEXPRT1"
+EXPORT_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".gz": "binary"}
+REPORT_COLUMNS = ["index", "endpoint", "endpoint_label", "encoding", "encoding_type",
+                  "content_type", "status_code", "request_length", "response_length",
+                  "response_time", "connect_time", "ttfb", "cluster", "verdict", "note",
+                  "response_digest"]
+COPY_CHUNK = 1024 * 1024
+PROGRESS_EVERY = 256
+_ROW_LENGTH = struct.Struct(">I")
+_BLOB_LENGTH = struct.Struct(">Q")
+
+
+def export_format(path):
+    """Export format implied by the file name suffix; None if unrecognised."""
+    for suffix, fmt in EXPORT_FORMATS.items():
+        if path.lower().endswith(suffix):
+            return fmt
+    return None
+
+
+def report_row(pipeline, index, result):
+    endpoint = result.endpoint
+    return {
+        "index": index,
+        "endpoint": endpoint.id if endpoint else None,
+        "endpoint_label": endpoint.label if endpoint else "",
+        "encoding": result.encoding,
+        "encoding_type": result.encoding_type,
+        "content_type": result.content_type,
+        "status_code": result.status_code,
+        "request_length": result.request_length,
+        "response_length": result.response_length,
+        "response_time": result.response_time,
+        "connect_time": result.connect_time,
+        "ttfb": result.ttfb,
+        "cluster": result.cluster,
+        "verdict": pipeline.verdict(index, result),
+        "note": result.note,
+        "response_digest": result.response_digest,
+    }
+
+
+def export_results(pipeline, path, fmt=None, progress=None):
+    """Write every result in the store to `path`; returns the row count.
+
+    progress(done, total) is called every PROGRESS_EVERY rows and may
+    return False to cancel, in which case nothing is left at `path` and
+    None is returned. Output goes to `path`.part until it is complete.
+    """
+    fmt = fmt or export_format(path) or "csv"
+    if fmt not in ("csv", "jsonl", "binary"):
+        raise ValueError("unknown export format: %s" % fmt)
+    staged = path + ".part"
+    store = pipeline.store
+    indices = store.indices()
+    total = len(indices)
+    done = 0
+    cancelled = False
+    f = gzip.open(staged, "wb") if fmt == "binary" else open(staged, "w")
+    try:
+        if fmt == "csv":
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(REPORT_COLUMNS)
+        elif fmt == "binary":
+            f.write(EXPORT_MAGIC)
+        for index in indices:
+            if progress is not None and done % PROGRESS_EVERY == 0 and \
+                    progress(done, total) is False:
+                cancelled = True
+                break
+            result = store.get(index)
+            if result is None:
+                continue
+            row = report_row(pipeline, index, result)
+            if fmt == "csv":
+                writer.writerow(["" if row[name] is None else row[name]
+                                 for name in REPORT_COLUMNS])
+            elif fmt == "jsonl":
+                f.write(json.dumps(row, separators=(",", ":")) + "\n")
+            else:
+                data = json.dumps(row, separators=(",", ":")).encode("utf-8")
+                f.write(_ROW_LENGTH.pack(len(data)))
+                f.write(data)
+                _copy_blob(f, store, result.request_ref)
+                _copy_blob(f, store, result.response_ref)
+            done += 1
+    except Exception:
+        f.close()
+        _remove(staged)
+        raise
+    f.close()
+    if cancelled:
+        _remove(staged)
+        return None
+    if progress is not None:
+        progress(total, total)
+    if os.path.exists(path):
+        os.remove(path)
+    os.rename(staged, path)
+    return done
+
+
+def iter_binary_export(path):
+    """Yield (row, request, response) from a binary export; response may be None."""
+    with gzip.open(path, "rb") as f:
+        if f.read(len(EXPORT_MAGIC)) != EXPORT_MAGIC:
+            raise ValueError("not a WAF Bypass binary export: %s" % path)
+        while True:
+            head = f.read(_ROW_LENGTH.size)
+            if not head:
+                return
+            row = json.loads(f.read(_ROW_LENGTH.unpack(head)[0]).decode("utf-8"))
+            request = f.read(_BLOB_LENGTH.unpack(f.read(_BLOB_LENGTH.size))[0])
+            response = f.read(_BLOB_LENGTH.unpack(f.read(_BLOB_LENGTH.size))[0])
+            yield row, request, response or None
+
+
+def _copy_blob(f, store, ref):
+    length = ref[1] if ref is not None else 0
+    f.write(_BLOB_LENGTH.pack(length))
+    for offset in range(0, length, COPY_CHUNK):
+        f.write(store.read(ref, offset, min(COPY_CHUNK, length - offset)))
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""Response fingerprints and incremental clustering against a baseline."""
+import binascii
+import hashlib
+import re
+import threading
+
+from .byteutils import digest, to_hex
+
+_DIGITS = re.compile(b"[0-9]+")
+_SPACES = re.compile(br"\s+")
+_TOKENS = re.compile(b"[A-Za-z_]{2,}")
+
+
+def _popcount(value):
+    return bin(value).count("1")
+
+
+class ResponseFingerprint(object):
+    """Compact summary of a response used to tell WAF block pages apart.
+
+    Holds the status, a hash of the normalised body prefix (digits and
+    whitespace collapsed), a 64-bit SimHash of its word tokens and the set
+    of header names. Only the first FINGERPRINT_BYTES of the body are read.
+    """
+
+    __slots__ = ("status", "length", "body_hash", "simhash", "headers")
+
+    FINGERPRINT_BYTES = 64 * 1024
+
+    def __init__(self, status, length, body_hash, simhash, headers):
+        self.status = status
+        self.length = length
+        self.body_hash = body_hash
+        self.simhash = simhash
+        self.headers = headers
+
+    @classmethod
+    def from_response(cls, response):
+        head_end = response.find(b"\r\n\r\n")
+        if head_end < 0:
+            head, body = response, b""
+        else:
+            head, body = response[:head_end], response[head_end + 4:head_end + 4 + cls.FINGERPRINT_BYTES]
+        lines = head.split(b"\r\n")
+        status = -1
+        parts = lines[0].split(b" ", 2)
+        if len(parts) > 1 and parts[1].isdigit():
+            status = int(parts[1])
+        headers = frozenset([line.split(b":", 1)[0].strip().lower()
+                             for line in lines[1:] if b":" in line])
+        normalized = _SPACES.sub(b" ", _DIGITS.sub(b"0", body.lower()))
+        return cls(status, len(response), digest(normalized),
+                   cls.simhash_of(_TOKENS.findall(normalized)), headers)
+
+    def to_list(self):
+        """JSON-friendly form for project files."""
+        return [self.status, self.length, to_hex(self.body_hash), self.simhash,
+                sorted([name.decode("iso-8859-1") for name in self.headers])]
+
+    @classmethod
+    def from_list(cls, values):
+        status, length, body_hash, simhash, headers = values
+        return cls(status, length, binascii.unhexlify(body_hash), simhash,
+                   frozenset([name.encode("iso-8859-1") for name in headers]))
+
+    @staticmethod
+    def simhash_of(tokens):
+        counts = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        weights = [0] * 64
+        for token, count in counts.items():
+            value = int(hashlib.md5(token).hexdigest()[:16], 16)
+            for bit in range(64):
+                if value & (1 << bit):
+                    weights[bit] += count
+                else:
+                    weights[bit] -= count
+        simhash = 0
+        for bit in range(64):
+            if weights[bit] > 0:
+                simhash |= 1 << bit
+        return simhash
+
+    def distance(self, other):
+        return _popcount(self.simhash ^ other.simhash)
+
+
+class ResponseClusterer(object):
+    """Incrementally groups fingerprints and compares them to a baseline.
+
+    Exact (status, body hash) matches are a dictionary hit; otherwise the
+    fingerprint is compared with at most max_clusters representatives, so
+    each response costs O(1) and a run of n responses stays O(n).
+    """
+
+    def __init__(self, max_distance=8, max_header_diff=2, max_clusters=64):
+        self.max_distance = max_distance
+        self.max_header_diff = max_header_diff
+        self.max_clusters = max_clusters
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._exact = {}
+            self._representatives = []
+            self._next_cluster = 1
+            self.sizes = {}
+            self.baseline = None
+
+    def add(self, fingerprint):
+        with self._lock:
+            key = (fingerprint.status, fingerprint.body_hash)
+            cluster = self._exact.get(key)
+            if cluster is None:
+                cluster = self._nearest(fingerprint)
+                self._exact[key] = cluster
+            self.sizes[cluster] = self.sizes.get(cluster, 0) + 1
+            return cluster
+
+    def restore(self, fingerprint, cluster):
+        """Re-register a saved (fingerprint, cluster) pair without re-clustering."""
+        with self._lock:
+            self._exact.setdefault((fingerprint.status, fingerprint.body_hash), cluster)
+            if cluster >= self._next_cluster:
+                self._representatives.append((cluster, fingerprint))
+                self._next_cluster = cluster + 1
+            elif cluster not in [known for known, _ in self._representatives]:
+                self._representatives.append((cluster, fingerprint))
+            self.sizes[cluster] = self.sizes.get(cluster, 0) + 1
+
+    def set_baseline(self, cluster):
+        self.baseline = cluster
+
+    def verdict(self, cluster):
+        if cluster is None or self.baseline is None:
+            return "-"
+        if cluster == self.baseline:
+            return "Same as baseline"
+        return "DIFFERS"
+
+    def _nearest(self, fingerprint):
+        best, best_distance = None, None
+        for cluster, representative in self._representatives:
+            if representative.status != fingerprint.status:
+                continue
+            distance = representative.distance(fingerprint)
+            if distance > self.max_distance:
+                continue
+            if len(representative.headers ^ fingerprint.headers) > self.max_header_diff:
+                continue
+            if best is None or distance < best_distance:
+                best, best_distance = cluster, distance
+        if best is not None:
+            return best
+        if len(self._representatives) >= self.max_clusters:
+            same_status = [(representative.distance(fingerprint), cluster)
+                           for cluster, representative in self._representatives
+                           if representative.status == fingerprint.status]
+            if same_status:
+                return min(same_status)[1]
+        cluster = self._next_cluster
+        self._next_cluster += 1
+        self._representatives.append((cluster, fingerprint))
+        return cluster
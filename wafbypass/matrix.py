@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""Lazy combinatorial fuzz matrix and the settings snapshot it is built from."""
+import itertools
+from collections import namedtuple
+
+from .byteutils import digest
+from .encoding import ENCODINGS
+
+
+def build_matrix(templates, charset_styles=("canonical",), encodings=ENCODINGS):
+    matrix = FuzzMatrix()
+    matrix.add_axis("encoding", encodings)
+    matrix.add_axis("template", templates)
+    matrix.add_axis("charset", charset_styles)
+    return matrix
+
+
+class FuzzConfig(namedtuple("FuzzConfig", ["templates", "charset_styles", "encodings",
+                                           "update_ct", "update_cl", "fields"])):
+    """Immutable snapshot of the generation settings.
+
+    Taken once (on the EDT in the panel) and then shared freely between
+    generator threads, which never touch widgets. `fields` holds glob
+    patterns of body fields to encode; empty means the whole body.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, templates, charset_styles=("canonical",), encodings=ENCODINGS,
+                update_ct=True, update_cl=True, fields=()):
+        return super(FuzzConfig, cls).__new__(cls, tuple(templates), tuple(charset_styles),
+                                              tuple(encodings), bool(update_ct), bool(update_cl),
+                                              tuple(fields))
+
+    def matrix(self):
+        return build_matrix(self.templates, self.charset_styles, self.encodings)
+
+
+class FuzzMatrix(object):
+    """Lazily enumerated cross product of named fuzz axes.
+
+    Combinations are built one at a time as the caller consumes them, so the
+    matrix never exists in memory as a whole. Byte-identical requests are
+    skipped by digest, and the counters below double as a progress report.
+    """
+
+    def __init__(self):
+        self._axes = []
+        self.generated = 0
+        self.duplicates = 0
+        self.failed = 0
+
+    def add_axis(self, name, values):
+        self._axes.append((name, list(values)))
+        return self
+
+    @property
+    def total(self):
+        if not self._axes:
+            return 0
+        total = 1
+        for _, values in self._axes:
+            total *= len(values)
+        return total
+
+    @property
+    def processed(self):
+        return self.generated + self.duplicates + self.failed
+
+    def combinations(self):
+        names = [name for name, _ in self._axes]
+        for values in itertools.product(*[values for _, values in self._axes]):
+            yield dict(zip(names, values))
+
+    def groups(self):
+        """Combinations in order, batched by the value of the first axis."""
+        name = self._axes[0][0] if self._axes else None
+        return (list(group) for _, group in
+                itertools.groupby(self.combinations(), lambda combo: combo[name]))
+
+    def variants(self, build, on_error=None, pool=None):
+        """Yield (combo, request) in matrix order, skipping duplicates.
+
+        With a WorkerPool, each first-axis group (every variant of one
+        encoding) is built as one task, so siblings share the encoded body,
+        and results are still consumed strictly in order.
+        """
+        if pool is None:
+            built = ((combo, _build(build, combo)) for combo in self.combinations())
+        else:
+            built = (pair for _, pairs, _ in pool.map_ordered(
+                lambda group: [(combo, _build(build, combo)) for combo in group],
+                self.groups()) for pair in pairs)
+        seen = set()
+        for combo, (request, error) in built:
+            if error is not None:
+                self.failed += 1
+                if on_error:
+                    on_error(combo, error)
+                continue
+            key = digest(request)
+            if key in seen:
+                self.duplicates += 1
+                continue
+            seen.add(key)
+            self.generated += 1
+            yield combo, request
+
+
+def _build(build, combo):
+    try:
+        return build(combo), None
+    except Exception as e:
+        return None, e
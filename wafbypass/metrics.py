@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""Nanosecond stage timings: a small registry of log-bucketed histograms."""
+import csv
+import json
+import threading
+import time
+from collections import deque
+
+try:
+    from java.lang import System
+
+    clock = System.nanoTime
+except ImportError:
+    if hasattr(time, "perf_counter_ns"):
+        clock = time.perf_counter_ns
+    else:
+        def clock():
+            return int(time.time() * 1e9)
+
+STAGES = ["encode", "build", "queue", "send", "analyze", "ui"]
+
+_SUB_BUCKETS = 4
+
+
+def _bucket(value):
+    if value < _SUB_BUCKETS:
+        return max(0, int(value))
+    bits = int(value).bit_length()
+    sub = (int(value) >> (bits - 3)) & (_SUB_BUCKETS - 1)
+    return bits * _SUB_BUCKETS + sub
+
+
+def _bucket_upper(bucket):
+    if bucket < _SUB_BUCKETS:
+        return bucket
+    bits, sub = divmod(bucket, _SUB_BUCKETS)
+    return (_SUB_BUCKETS + sub + 1) << (bits - 3)
+
+
+class Histogram(object):
+    """Log-linear histogram: four sub-buckets per power of two (<25% error)."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+        self._buckets = {}
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        bucket = _bucket(value)
+        self._buckets[bucket] = self._buckets.get(bucket, 0) + 1
+
+    @property
+    def mean(self):
+        return self.total / float(self.count) if self.count else 0.0
+
+    def percentile(self, pct):
+        if not self.count:
+            return 0
+        rank = pct / 100.0 * self.count
+        seen = 0
+        for bucket in sorted(self._buckets):
+            seen += self._buckets[bucket]
+            if seen >= rank:
+                return min(_bucket_upper(bucket), self.max)
+        return self.max
+
+
+class MetricsRegistry(object):
+    """Per-stage histograms plus a bounded log of raw (index, stage, ns) samples.
+
+    record() is cheap enough to call for every variant from any thread; the
+    raw log keeps the newest max_samples entries for CSV/JSON export, and
+    per-second counters give a recent throughput for each stage.
+    """
+
+    def __init__(self, max_samples=200000, rate_window=10):
+        self._lock = threading.Lock()
+        self.max_samples = max_samples
+        self.rate_window = rate_window
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+            self._samples = deque(maxlen=self.max_samples)
+            self._ticks = {}
+            self.started = clock()
+
+    def record(self, stage, elapsed_ns, index=None):
+        now = clock()
+        second = now // 1000000000
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram()
+            histogram.add(elapsed_ns)
+            self._samples.append((index, stage, elapsed_ns, now - self.started))
+            ticks = self._ticks.get(stage)
+            if ticks is None:
+                ticks = self._ticks[stage] = deque()
+            if ticks and ticks[-1][0] == second:
+                ticks[-1][1] += 1
+            else:
+                ticks.append([second, 1])
+                while ticks[0][0] <= second - self.rate_window:
+                    ticks.popleft()
+
+    def rate(self, stage):
+        """Events per second for `stage` over the last rate_window seconds."""
+        horizon = clock() // 1000000000 - self.rate_window
+        with self._lock:
+            ticks = self._ticks.get(stage) or []
+            return sum([count for second, count in ticks if second > horizon]) / float(self.rate_window)
+
+    def snapshot(self):
+        """[(stage, count, mean, p50, p95, p99, max, total)] in ns, known stages first."""
+        with self._lock:
+            names = [stage for stage in STAGES if stage in self._histograms]
+            names += sorted([stage for stage in self._histograms if stage not in STAGES])
+            rows = []
+            for stage in names:
+                h = self._histograms[stage]
+                rows.append((stage, h.count, h.mean, h.percentile(50), h.percentile(95),
+                             h.percentile(99), h.max, h.total))
+            return rows
+
+    def samples(self):
+        with self._lock:
+            return list(self._samples)
+
+    def export_csv(self, path):
+        samples = self.samples()
+        with open(path, "w") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(["index", "stage", "duration_ns", "at_ns"])
+            for index, stage, elapsed, at in samples:
+                writer.writerow(["" if index is None else index, stage, elapsed, at])
+        return len(samples)
+
+    def export_json(self, path):
+        samples = self.samples()
+        stages = [dict(zip(("stage", "count", "mean_ns", "p50_ns", "p95_ns", "p99_ns",
+                            "max_ns", "total_ns"), row)) for row in self.snapshot()]
+        with open(path, "w") as f:
+            json.dump({"stages": stages,
+                       "samples": [{"index": index, "stage": stage, "duration_ns": elapsed,
+                                    "at_ns": at} for index, stage, elapsed, at in samples]}, f)
+        return len(samples)
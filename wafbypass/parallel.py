@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""Ordered fan-out of CPU-bound work onto a fixed pool of threads.
+
+Under Jython the pool is a JVM ExecutorService, whose threads run Python
+code truly in parallel. CPython has the GIL, so there the default pool
+size is 1 and work simply runs inline on the caller's thread.
+"""
+import threading
+from collections import deque
+
+try:
+    from java.lang import Runtime, Thread
+    from java.util.concurrent import Callable, Executors, ThreadFactory
+except ImportError:
+    Executors = None
+
+
+def cpu_count():
+    if Executors is not None:
+        return Runtime.getRuntime().availableProcessors()
+    return 1
+
+
+def _call(func, item):
+    try:
+        return func(item), None
+    except Exception as e:
+        return None, e
+
+
+if Executors is not None:
+    class _Task(Callable):
+        def __init__(self, func, item):
+            self._func = func
+            self._item = item
+
+        def call(self):
+            return _call(self._func, self._item)
+
+    class _DaemonThreads(ThreadFactory):
+        def __init__(self, name):
+            self._name = name
+            self._count = 0
+
+        def newThread(self, runnable):
+            self._count += 1
+            thread = Thread(runnable, "%s-%d" % (self._name, self._count))
+            thread.setDaemon(True)
+            return thread
+
+
+class WorkerPool(object):
+    """Evaluates func(item) ahead of the consumer, yielding in input order.
+
+    map_ordered() keeps at most `window` items in flight, so memory stays
+    bounded however long the input is, and the output order never depends
+    on which thread finished first. Exceptions are returned, not raised.
+    """
+
+    def __init__(self, workers=None, name="waf-bypass-generator"):
+        self.workers = max(1, int(workers or cpu_count()))
+        self._name = name
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def map_ordered(self, func, items, window=None):
+        """Yield (item, result, error) for each item, in order."""
+        if self.workers == 1 or Executors is None:
+            for item in items:
+                result, error = _call(func, item)
+                yield item, result, error
+            return
+        executor = self._ensure_executor()
+        window = window or self.workers * 2
+        in_flight = deque()
+        for item in items:
+            in_flight.append((item, executor.submit(_Task(func, item))))
+            if len(in_flight) >= window:
+                item, future = in_flight.popleft()
+                result, error = future.get()
+                yield item, result, error
+        while in_flight:
+            item, future = in_flight.popleft()
+            result, error = future.get()
+            yield item, result, error
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdownNow()
+
+    def _ensure_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = Executors.newFixedThreadPool(self.workers,
+                                                              _DaemonThreads(self._name))
+            return self._executor
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""Background expansion of passively observed requests."""
+import threading
+import time
+from collections import deque
+
+from .pipeline import ERROR, INFO
+
+
+def endpoint_signature(template, target):
+    """(method, scheme, host, port, path, mime): one expansion per endpoint shape."""
+    request_line = template.headers[0].split(" ") if template.headers else []
+    method = request_line[0].upper() if request_line else ""
+    path = request_line[1].split("?", 1)[0] if len(request_line) > 1 else "/"
+    mime = template.content_type.split(";", 1)[0].strip().lower()
+    return (method, bool(target.use_https), target.host.lower(), target.port, path, mime)
+
+
+class PassiveExpander(object):
+    """Bounded intake queue drained by a small pool of expansion workers.
+
+    offer() runs on the proxy thread, so it only appends the raw message to
+    a deque and sets an event; when max_pending messages are waiting, new
+    ones are dropped and counted. Workers call prepare(message), which
+    returns (template, target) or None for out-of-scope or bodiless
+    traffic, skip endpoint signatures already expanded, and fuzz the rest
+    as campaign endpoints with the current FuzzConfig. Variants go through
+    the pipeline's dispatcher, so they share its rate limit, and a worker
+    waits while more than max_backlog sends are queued so manual runs are
+    never buried.
+    """
+
+    def __init__(self, pipeline, prepare, config, workers=1, max_pending=256, max_backlog=200):
+        self.pipeline = pipeline
+        self.prepare = prepare
+        self.config = config
+        self.max_pending = max_pending
+        self.max_backlog = max_backlog
+        self._workers = max(1, int(workers))
+        self._pending = deque()
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._seen = set()
+        self._threads = []
+        self._running = False
+        # Bumped by start() and stop(); workers of an older generation exit
+        # instead of running alongside the ones a quick re-start creates.
+        self._generation = 0
+        self.dropped = 0
+        self.skipped = 0
+        self.expanded = 0
+
+    def offer(self, message):
+        """Hand over a message; never blocks. Returns False if it was dropped."""
+        if not self._running:
+            return False
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            return False
+        self._pending.append(message)
+        self._event.set()
+        return True
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    @property
+    def running(self):
+        return self._running
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._generation += 1
+        self._threads = []
+        for worker_id in range(self._workers):
+            thread = threading.Thread(target=self._work, args=(self._generation,),
+                                      name="waf-bypass-passive-%d" % (worker_id + 1))
+            thread.daemon = True
+            self._threads.append(thread)
+            thread.start()
+
+    def stop(self):
+        """Stop intake; messages still waiting are discarded."""
+        self._running = False
+        self._generation += 1
+        self._pending.clear()
+        self._event.set()
+
+    def forget(self):
+        """Clear remembered signatures so endpoints are expanded again."""
+        with self._lock:
+            self._seen.clear()
+
+    def _claim(self, signature):
+        with self._lock:
+            if signature in self._seen:
+                return False
+            self._seen.add(signature)
+            return True
+
+    def _current(self, generation):
+        return self._running and generation == self._generation
+
+    def _work(self, generation):
+        log = self.pipeline.listener.log
+        while self._current(generation):
+            try:
+                message = self._pending.popleft()
+            except IndexError:
+                self._event.wait(1.0)
+                self._event.clear()
+                continue
+            try:
+                prepared = self.prepare(message)
+                if prepared is None:
+                    self.skipped += 1
+                    continue
+                template, target = prepared
+                if not self._claim(endpoint_signature(template, target)):
+                    self.skipped += 1
+                    continue
+                dispatcher = self.pipeline.dispatcher
+                while self._current(generation) and dispatcher.queue_depth() > self.max_backlog:
+                    time.sleep(0.2)
+                if not self._current(generation):
+                    return
+                endpoint = self.pipeline.add_endpoint(template, target)
+                log("[*] Passive: expanding E%d %s" % (endpoint.id, endpoint.label), INFO)
+                config = self.config
+                self.pipeline.generate(template, config.matrix(), config.update_ct,
+                                       config.update_cl, endpoint=endpoint, fields=config.fields)
+                self.pipeline.submit_all(indices=endpoint.indices)
+                self.expanded += 1
+            except Exception as e:
+                log("[-] Passive expansion failed: %s" % str(e), ERROR)
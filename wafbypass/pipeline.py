@@ -0,0 +1,517 @@
+# -*- coding: utf-8 -*-
+"""Encode/build/send pipeline shared by the Burp panel and headless runs.
+
+The pipeline owns the encoding engine, result store, response clusterer
+and sender pool. It talks to the network only through a Transport and
+reports progress through a PipelineListener, so it runs unchanged inside
+Burp (Jython, makeHttpRequest) or under CPython against a socket.
+"""
+import threading
+
+from .byteutils import digest, to_hex
+from .campaign import Endpoint
+from .dispatch import FifoQueue, SendDispatcher
+from .encoding import ENCODINGS, EncodingEngine, iter_text_chunks
+from .fingerprint import ResponseFingerprint
+from .matrix import build_matrix
+from .metrics import MetricsRegistry, clock
+from .parallel import WorkerPool
+from .project import RESULT_ATTRIBUTES, RESULT_FIELDS, ProjectWriter, read_index
+from .regions import RegionSplicer, index_regions, select_regions
+from .results import FuzzResult, ResultStore
+from .scheduler import AdaptiveScheduler
+from .template import RequestTemplate
+from .transport import Target
+
+DEBUG = 10
+INFO = 20
+WARN = 30
+ERROR = 40
+
+STREAM_THRESHOLD_CHARS = 1024 * 1024
+
+
+class PipelineListener(object):
+    """Receives pipeline events. Methods may be called from any thread."""
+
+    def log(self, message, level=INFO):
+        pass
+
+    def result_added(self, index, result):
+        pass
+
+    def result_updated(self, index, result):
+        pass
+
+    def baseline_changed(self, endpoint):
+        pass
+
+    def endpoint_added(self, endpoint):
+        pass
+
+
+class FuzzPipeline(object):
+
+    def __init__(self, transport, listener=None, engine=None, store=None,
+                 workers=4, rate=10.0, generators=None, keep_response_bytes=None):
+        self.transport = transport
+        self.listener = listener or PipelineListener()
+        self.engine = engine or EncodingEngine()
+        self.store = store or ResultStore()
+        self.endpoints = []
+        self._lock = threading.Lock()
+        self._next_index = 0
+        self.scheduler = None
+        self.cache = None
+        self.metrics = MetricsRegistry()
+        self.generators = WorkerPool(generators)
+        # Bytes of each response kept in the store (None keeps them whole);
+        # variants in keep_full are always stored in full.
+        self.keep_response_bytes = keep_response_bytes
+        self.keep_full = set()
+        self.dispatcher = SendDispatcher(
+            workers, rate,
+            on_idle=lambda: self.listener.log("[*] Send queue drained"),
+            on_error=lambda message: self.listener.log(message, ERROR),
+        )
+
+    def reset(self):
+        self.dispatcher.cancel()
+        self.store.clear()
+        self.metrics.reset()
+        with self._lock:
+            self.endpoints = []
+            self._next_index = 0
+        self.keep_full.clear()
+
+    def set_adaptive(self, enabled, block_threshold=3, max_bypasses=3):
+        """Switch the send queue between FIFO and the AdaptiveScheduler."""
+        if not enabled:
+            if self.scheduler is not None:
+                self.scheduler = None
+                self.dispatcher.set_queue(FifoQueue())
+            return
+        if self.scheduler is None:
+            self.scheduler = AdaptiveScheduler(block_threshold, max_bypasses,
+                                               self._skip, self.dispatcher.wake)
+            self.dispatcher.set_queue(self.scheduler)
+        else:
+            self.scheduler.configure(block_threshold, max_bypasses)
+
+    def close(self):
+        self.dispatcher.cancel()
+        self.generators.shutdown()
+        self.store.close()
+        self.transport.close()
+
+    @staticmethod
+    def create_matrix(templates, charset_styles=("canonical",), encodings=ENCODINGS):
+        return build_matrix(templates, charset_styles, encodings)
+
+    def content_type(self, encoding, template, style="canonical"):
+        return template.replace("{encoding}", self.engine.get_charset_name(encoding, style))
+
+    def build(self, template, encoding, content_type, update_ct=True, update_cl=True,
+              timings=None, splicer=None, charset=None):
+        """Encode the body and render the request; stage times go into `timings`.
+
+        With a RegionSplicer only its regions are encoded (`charset` names
+        the encoding in multipart part headers). The streaming path
+        interleaves encoding with rendering, so its whole cost is reported
+        as "build".
+        """
+        body = template.body
+        start = clock()
+        if splicer is None and len(body) > STREAM_THRESHOLD_CHARS:
+            request = template.render_chunks(
+                self.engine.iter_encode(iter_text_chunks(body), encoding),
+                content_type, update_ct, update_cl
+            )
+            if timings is not None:
+                timings["build"] = clock() - start
+            return request
+        if splicer is not None:
+            encoded = splicer.render(self.engine, encoding, charset)
+        else:
+            encoded = self.engine.encode(body, encoding)
+        encoded_at = clock()
+        request = template.render(encoded, content_type, update_ct, update_cl)
+        if timings is not None:
+            timings["encode"] = encoded_at - start
+            timings["build"] = clock() - encoded_at
+        return request
+
+    def add_endpoint(self, template, target=None):
+        with self._lock:
+            endpoint = Endpoint(len(self.endpoints) + 1, template, target)
+            self.endpoints.append(endpoint)
+        self.listener.endpoint_added(endpoint)
+        return endpoint
+
+    def verdict(self, index, result):
+        if result.endpoint is None:
+            return "-"
+        return result.endpoint.verdict(index, result.cluster)
+
+    def _add_result(self, endpoint, result, request):
+        # Stored under the lock so a running save_project() sees every
+        # result it snapshots with its final blob refs.
+        result.endpoint = endpoint
+        with self._lock:
+            index = self._next_index
+            self._next_index += 1
+            self.store.add(index, result, request)
+        endpoint.indices.append(index)
+        self.listener.result_added(index, result)
+        return index
+
+    def add_baseline(self, endpoint):
+        template = endpoint.template
+        content_type = template.content_type or "-"
+        # Bodies from Burp were decoded as Latin-1; only text typed into the
+        # panel can hold characters beyond it, which then go out as UTF-8.
+        try:
+            body = template.body.encode("iso-8859-1")
+        except UnicodeError:
+            body = template.body.encode("utf-8")
+        request = template.render(body, content_type, False, True)
+        result = FuzzResult("(unencoded)", "-", content_type, len(request))
+        endpoint.baseline_index = self._add_result(endpoint, result, request)
+        return result
+
+    def splicer(self, template, fields):
+        """RegionSplicer over the body fields matching `fields` globs, or None."""
+        regions = select_regions(index_regions(template.body, template.content_type), fields)
+        if not regions:
+            return None
+        return RegionSplicer(template.body, regions)
+
+    def generate(self, template, matrix, update_ct=True, update_cl=True, baseline=True,
+                 endpoint=None, fields=()):
+        """Expand `template` over `matrix` into the result store.
+
+        With `fields`, only the matching body regions are re-encoded; a
+        multipart body keeps its Content-Type (and boundary) and declares
+        each re-encoded part's charset in the part header instead.
+        Bodies below the streaming threshold are encoded on the generator
+        pool, one encoding per task; variants are still stored in matrix
+        order, each as soon as it and everything before it is built.
+        """
+        if endpoint is None:
+            endpoint = self.add_endpoint(template)
+        try:
+            return self._generate(endpoint, template, matrix, update_ct, update_cl, baseline,
+                                  fields)
+        finally:
+            endpoint.generating = False
+
+    def _generate(self, endpoint, template, matrix, update_ct, update_cl, baseline, fields):
+        if baseline:
+            self.add_baseline(endpoint)
+        log = self.listener.log
+        splicer = self.splicer(template, fields) if fields else None
+        if splicer is not None:
+            log("[*] E%d: encoding %d fields (%d of %d chars)" % (
+                endpoint.id, len(splicer.regions), splicer.payload_chars, len(template.body)))
+            if splicer.multipart:
+                update_ct = False
+        elif fields:
+            log("[*] E%d: no body fields match %s, encoding the whole body" % (
+                endpoint.id, ", ".join(fields)), WARN)
+
+        def build(combo):
+            encoding = combo["encoding"][0]
+            content_type = self.content_type(encoding, combo["template"], combo["charset"])
+            combo["content_type"] = content_type
+            combo["timings"] = {}
+            charset = None
+            if splicer is not None:
+                charset = self.engine.get_charset_name(encoding, combo["charset"])
+            return self.build(template, encoding, content_type, update_ct, update_cl,
+                              combo["timings"], splicer, charset)
+
+        def on_error(combo, e):
+            log("[-] %s failed: %s" % (combo["encoding"][0], str(e)), ERROR)
+
+        pool = None
+        if splicer is not None or len(template.body) <= STREAM_THRESHOLD_CHARS:
+            pool = self.generators
+        for combo, request in matrix.variants(build, on_error, pool):
+            encoding, encoding_type = combo["encoding"]
+            result = FuzzResult(encoding, encoding_type, combo["content_type"], len(request))
+            index = self._add_result(endpoint, result, request)
+            for stage, elapsed in combo["timings"].items():
+                self.metrics.record(stage, elapsed, index)
+            log("[+] #%d %s - %d bytes (%d/%d)" % (
+                index, encoding, len(request), matrix.processed, matrix.total
+            ), DEBUG)
+        log("[*] E%d %s: generated %d, duplicates skipped: %d, failed: %d" % (
+            endpoint.id, endpoint.label, matrix.generated, matrix.duplicates, matrix.failed
+        ))
+        return matrix
+
+    def run_campaign(self, requests, config):
+        """Fuzz every (template, target) pair through the shared dispatcher.
+
+        Each endpoint's variants are queued as soon as it is generated, so
+        sending to early endpoints overlaps generation of the later ones.
+        """
+        endpoints = [self.add_endpoint(template, target) for template, target in requests]
+        self.listener.log("[*] Campaign: %d endpoints queued" % len(endpoints))
+        try:
+            for endpoint in endpoints:
+                self.generate(endpoint.template, config.matrix(), config.update_ct,
+                              config.update_cl, endpoint=endpoint, fields=config.fields)
+                self.submit_all(indices=endpoint.indices)
+        finally:
+            for endpoint in endpoints:
+                endpoint.generating = False
+        return endpoints
+
+    def save_project(self, path):
+        """Write endpoints, results and their bytes to a project file at `path`.
+
+        Blobs are streamed into `path`.tmp, which then replaces `path` and
+        becomes the store's backing file. The send queue must be idle and
+        no endpoint may still be generating; the pipeline lock is held
+        throughout, so concurrent saves and late results wait for it.
+        """
+        with self._lock:
+            if not self.dispatcher.wait_idle(0):
+                raise RuntimeError("Cannot save while variants are queued or sending")
+            if any([endpoint.generating for endpoint in self.endpoints]):
+                raise RuntimeError("Cannot save while variants are being generated")
+            endpoints, rows = self._save_project(path)
+        self.listener.log("[*] Saved %d endpoints, %d results to %s" % (
+            len(endpoints), len(rows), path))
+
+    def _save_project(self, path):
+        staged = path + ".tmp"
+        writer = ProjectWriter(staged)
+        refs = {}
+        try:
+            endpoints = []
+            for endpoint in list(self.endpoints):
+                endpoints.append({
+                    "id": endpoint.id,
+                    "template": endpoint.template.raw,
+                    "target": list(endpoint.target) if endpoint.target else None,
+                    "baseline_index": endpoint.baseline_index,
+                    "baseline_cluster": endpoint.clusters.baseline,
+                })
+            rows = []
+            for index in self.store.indices():
+                result = self.store.get(index)
+                refs[index] = (writer.copy(self.store.read, result.request_ref),
+                               writer.copy(self.store.read, result.response_ref))
+                endpoint = result.endpoint
+                row = dict((name, getattr(result, name)) for name in RESULT_ATTRIBUTES)
+                row.update(index=index, endpoint=endpoint.id if endpoint else None,
+                           request_ref=refs[index][0], response_ref=refs[index][1],
+                           recorded=bool(endpoint and endpoint.recorded(index)),
+                           response_digest=result.response_digest,
+                           fingerprint=result.fingerprint.to_list() if result.fingerprint else None)
+                rows.append([row[name] for name in RESULT_FIELDS])
+            writer.finish({"endpoints": endpoints, "results": rows,
+                           "next_index": self._next_index})
+        except Exception:
+            writer.abort()
+            raise
+        self.store.rebase(path, staged, refs)
+        return endpoints, rows
+
+    def open_project(self, path):
+        """Replace the current state with a saved project; only its index is
+        read now, request/response bytes are read from the file on demand.
+        """
+        index = read_index(path)
+        self.reset()
+        endpoints = {}
+        for data in index["endpoints"]:
+            target = Target(*data["target"]) if data["target"] else None
+            endpoint = Endpoint(data["id"], RequestTemplate(data["template"]), target)
+            endpoint.baseline_index = data["baseline_index"]
+            endpoint.generating = False
+            endpoints[endpoint.id] = endpoint
+        results = {}
+        for row in index["results"]:
+            row = dict(zip(RESULT_FIELDS, row))
+            result = FuzzResult(row["encoding"], row["encoding_type"], row["content_type"],
+                                row["request_length"])
+            for name in RESULT_ATTRIBUTES[4:]:
+                setattr(result, name, row[name])
+            result.request_ref = tuple(row["request_ref"]) if row["request_ref"] else None
+            result.response_ref = tuple(row["response_ref"]) if row["response_ref"] else None
+            result.response_digest = row.get("response_digest")
+            endpoint = result.endpoint = endpoints.get(row["endpoint"])
+            if endpoint is not None:
+                endpoint.indices.append(row["index"])
+                if row["fingerprint"]:
+                    result.fingerprint = ResponseFingerprint.from_list(row["fingerprint"])
+                    endpoint.clusters.restore(result.fingerprint, result.cluster)
+                if row["recorded"]:
+                    endpoint.record(row["index"], result.cluster)
+            results[row["index"]] = result
+        for data in index["endpoints"]:
+            endpoints[data["id"]].clusters.set_baseline(data["baseline_cluster"])
+        self.store.attach(path, results)
+        with self._lock:
+            self.endpoints = [endpoints[key] for key in sorted(endpoints)]
+            self._next_index = index["next_index"]
+        for endpoint in self.endpoints:
+            self.listener.endpoint_added(endpoint)
+        for key in sorted(results):
+            self.listener.result_added(key, results[key])
+        self.listener.log("[*] Opened %s: %d endpoints, %d results" % (
+            path, len(endpoints), len(results)))
+
+    def submit(self, index, target=None, use_cache=True):
+        """Queue one variant; with a cache, a stored response is reused instead."""
+        result = self.store.get(index)
+        if result is None:
+            return False
+        if result.endpoint is not None and result.endpoint.target is not None:
+            target = result.endpoint.target
+        if target is None:
+            self.listener.log("[-] Fuzz #%d has no target" % index, ERROR)
+            return False
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.key(target, self.store.request(result))
+            cached = self.cache.get(cache_key) if use_cache else None
+            if cached is not None:
+                self._use_cached(index, result, cached)
+                return True
+        self.dispatcher.submit("#%d %s" % (index, result.encoding),
+                               self.send, index, result, target, cache_key, clock(),
+                               key=(index, result))
+        return True
+
+    def submit_all(self, target=None, indices=None):
+        """Queue `indices` (default: all), interleaving endpoints round-robin
+        so every baseline goes out first and no single host gets a burst.
+        Call off the EDT when a cache is set: lookups hash every request.
+        """
+        if indices is None:
+            indices = self.store.indices()
+        lanes = {}
+        order = []
+        for index in indices:
+            result = self.store.get(index)
+            key = result.endpoint.id if result is not None and result.endpoint else 0
+            if key not in lanes:
+                lanes[key] = []
+                order.append(key)
+            lanes[key].append(index)
+        depth = max([len(lane) for lane in lanes.values()] or [0])
+        for i in range(depth):
+            for key in order:
+                if i < len(lanes[key]):
+                    self.submit(lanes[key][i], target)
+
+    def needs_target(self, indices=None):
+        """True when some of `indices` belong to an endpoint without a target."""
+        if indices is None:
+            indices = self.store.indices()
+        for index in indices:
+            result = self.store.get(index)
+            if result is not None and (result.endpoint is None or result.endpoint.target is None):
+                return True
+        return False
+
+    def send(self, index, result, target, cache_key=None, queued_at=None):
+        log = self.listener.log
+        metrics = self.metrics
+        try:
+            if queued_at is not None:
+                metrics.record("queue", clock() - queued_at, index)
+            log("[*] Sending Fuzz #%d (%s)..." % (index, result.encoding), DEBUG)
+            request = self.store.request(result)
+            start = clock()
+            response, result.connect_time, result.ttfb = self.transport.exchange(target, request)
+            elapsed = clock() - start
+            metrics.record("send", elapsed, index)
+            result.response_time = int(elapsed // 1000000)
+            if response:
+                self._complete(index, result, response, "Done")
+                cache = self.cache
+                if cache is not None and cache_key is not None:
+                    cache.put(cache_key, response, result.response_time,
+                              result.connect_time, result.ttfb)
+            else:
+                with self._lock:
+                    self.store.set_response(result, None)
+                self._record(index, result)
+                result.note = "No Response"
+                log("[-] Fuzz #%d - No response" % index, WARN)
+        except Exception as e:
+            self._record(index, result)
+            result.note = "Error: %s" % str(e)
+            log("[-] Fuzz #%d failed: %s" % (index, str(e)), ERROR)
+        scheduler = self.scheduler
+        if scheduler is not None:
+            scheduler.observe(index, result)
+        self.listener.result_updated(index, result)
+
+    def _complete(self, index, result, response, note):
+        self.classify(index, result, response)
+        result.response_length = len(response)
+        limit = self.keep_response_bytes
+        if limit is not None and len(response) > limit and index not in self.keep_full:
+            response = response[:limit]
+        with self._lock:
+            self.store.set_response(result, response)
+        result.note = note
+        self.listener.log("[+] Fuzz #%d - Status: %d, Length: %d, Time: %dms%s" % (
+            index, result.status_code, result.response_length, result.response_time,
+            "" if note == "Done" else " (%s)" % note.lower()
+        ), DEBUG)
+        self._report_verdict(index, result)
+
+    def _use_cached(self, index, result, cached):
+        result.response_time = cached.response_time
+        result.connect_time = cached.connect_time
+        result.ttfb = cached.ttfb
+        try:
+            self._complete(index, result, cached.response, "Cached")
+        except Exception as e:
+            result.note = "Error: %s" % str(e)
+        scheduler = self.scheduler
+        if scheduler is not None:
+            scheduler.observe(index, result)
+        self.listener.result_updated(index, result)
+
+    def _skip(self, job, reason):
+        index, result = job.key
+        result.note = reason
+        self._record(index, result)
+        self.listener.log("[*] Fuzz #%d (%s) %s" % (index, result.encoding, reason.lower()), DEBUG)
+        self.listener.result_updated(index, result)
+
+    def classify(self, index, result, response):
+        endpoint = result.endpoint
+        start = clock()
+        result.fingerprint = ResponseFingerprint.from_response(response)
+        result.status_code = result.fingerprint.status
+        head_end = response.find(b"\r\n\r\n")
+        result.response_digest = to_hex(digest(response[head_end + 4:] if head_end >= 0 else b"",
+                                               "sha256"))
+        result.cluster = endpoint.clusters.add(result.fingerprint)
+        self.metrics.record("analyze", clock() - start, index)
+        if index == endpoint.baseline_index:
+            endpoint.clusters.set_baseline(result.cluster)
+            self.listener.baseline_changed(endpoint)
+        self._record(index, result)
+
+    def _record(self, index, result):
+        if result.endpoint is not None:
+            result.endpoint.record(index, result.cluster)
+
+    def _report_verdict(self, index, result):
+        endpoint = result.endpoint
+        if index == endpoint.baseline_index:
+            self.listener.log("[*] E%d baseline response in cluster C%d" % (endpoint.id, result.cluster))
+        elif endpoint.clusters.verdict(result.cluster) == "DIFFERS":
+            self.listener.log("[!] Fuzz #%d (%s) on %s differs from baseline: status %d, cluster C%d" % (
+                index, result.encoding, endpoint.label, result.status_code, result.cluster
+            ))
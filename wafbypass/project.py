@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""Indexed project files: length-prefixed blobs followed by a JSON index.
+
+Layout::
+
+    MAGIC
+    repeated: 8-byte big-endian length, blob bytes
+    index (UTF-8 JSON: endpoints with their raw templates, result rows)
+    footer: 8-byte index offset, 8-byte index length, FOOTER_MAGIC
+
+Reopening reads only the footer and the index; blobs are addressed by
+(offset, length) refs straight into the file and read on demand.
+"""
+import json
+import os
+import struct
+import time
+
+PROJECT_VERSION = 1
+MAGIC = b"WBPROJ1\n"
+FOOTER_MAGIC = b"WBPINDEX"
+_LENGTH = struct.Struct(">Q")
+_FOOTER = struct.Struct(">QQ8s")
+COPY_CHUNK = 1024 * 1024
+
+# Columns of each result row; "recorded" marks variants already counted
+# as completed by their endpoint (answered, skipped or failed). Columns
+# added later are appended, so older rows simply lack them.
+RESULT_FIELDS = ["index", "endpoint", "encoding", "encoding_type", "content_type",
+                 "request_length", "request_ref", "response_ref", "status_code",
+                 "response_length", "response_time", "connect_time", "ttfb", "note",
+                 "cluster", "recorded", "fingerprint", "response_digest"]
+RESULT_ATTRIBUTES = RESULT_FIELDS[2:6] + RESULT_FIELDS[8:15]
+
+
+class ProjectFormatError(ValueError):
+    pass
+
+
+class ProjectWriter(object):
+    """Streams blobs into a project file, then seals it with the index."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+        self._offset = len(MAGIC)
+
+    def copy(self, read, ref):
+        """Copy a blob of `ref` length, fetched in chunks via read(offset, size)."""
+        if ref is None:
+            return None
+        length = ref[1]
+        self._file.write(_LENGTH.pack(length))
+        for offset in range(0, length, COPY_CHUNK):
+            self._file.write(read(ref, offset, min(COPY_CHUNK, length - offset)))
+        new_ref = (self._offset + _LENGTH.size, length)
+        self._offset += _LENGTH.size + length
+        return new_ref
+
+    def finish(self, index):
+        index = dict(index, version=PROJECT_VERSION, saved_at=int(time.time()))
+        data = json.dumps(index, separators=(",", ":")).encode("utf-8")
+        self._file.write(data)
+        self._file.write(_FOOTER.pack(self._offset, len(data), FOOTER_MAGIC))
+        self._file.close()
+
+    def abort(self):
+        self._file.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def read_index(path):
+    """Read only the footer and JSON index of a project file."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ProjectFormatError("not a WAF Bypass project file: %s" % path)
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if size < len(MAGIC) + _FOOTER.size:
+            raise ProjectFormatError("truncated project file: %s" % path)
+        f.seek(size - _FOOTER.size)
+        offset, length, magic = _FOOTER.unpack(f.read(_FOOTER.size))
+        if magic != FOOTER_MAGIC or offset + length + _FOOTER.size != size:
+            raise ProjectFormatError("project index missing or damaged: %s" % path)
+        f.seek(offset)
+        index = json.loads(f.read(length).decode("utf-8"))
+    if index.get("version", 0) > PROJECT_VERSION:
+        raise ProjectFormatError("project was saved by a newer version")
+    return index
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""Payload regions of structured bodies, and splicing re-encoded regions back in.
+
+index_regions() scans a JSON, XML, form or multipart body once and
+returns the character offsets of every field value. RegionSplicer keeps
+the bytes between the chosen regions fixed, so each variant costs one
+encode of the payload text plus a join, whatever the document size.
+"""
+import json
+import re
+from collections import namedtuple
+
+try:
+    from urllib import unquote_plus
+except ImportError:
+    from urllib.parse import unquote_plus
+
+# header is the (start, end) span of a multipart part's header block, whose
+# Content-Type is rewritten to declare the part's charset; None otherwise.
+Region = namedtuple("Region", ["name", "start", "end", "kind", "header"])
+
+_JSON_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"|[{}\[\]:,]|[^\s{}\[\]:,"]+', re.S)
+_XML_TOKEN = re.compile(
+    r'<!\[CDATA\[(.*?)\]\]>|<!--.*?-->|<\?.*?\?>|<![^>]*>'
+    r'|</\s*([\w:.-]+)\s*>'
+    r'|<([\w:.-]+)((?:[^>"\']|"[^"]*"|\'[^\']*\')*?)(/?)>', re.S)
+_XML_ATTR = re.compile(r'([\w:.-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+_BOUNDARY = re.compile(r'boundary=(?:"([^"]+)"|([^\s;]+))', re.I)
+_PART_NAME = re.compile(r'\bname="([^"]*)"', re.I)
+_PART_TYPE = re.compile(r'^content-type:[^\r\n]*', re.I | re.M)
+_CHARSET_PARAM = re.compile(r'\s*;\s*charset=("[^"]*"|[^\s;]*)', re.I)
+
+
+def _mime(content_type):
+    return content_type.split(";", 1)[0].strip().lower()
+
+
+def index_regions(body, content_type=""):
+    """Field regions of `body`, by Content-Type (sniffed from the body if absent)."""
+    mime = _mime(content_type)
+    if mime.startswith("multipart/"):
+        match = _BOUNDARY.search(content_type)
+        return _multipart_regions(body, match.group(1) or match.group(2)) if match else []
+    if not mime:
+        head = body.lstrip()[:1]
+        mime = {"{": "json", "[": "json", "<": "xml"}.get(head, "form" if "=" in body else "")
+    if "json" in mime:
+        return _json_regions(body)
+    if "xml" in mime:
+        return _xml_regions(body)
+    if "form" in mime:
+        return _form_regions(body)
+    return []
+
+
+def _field_pattern(pattern):
+    # Only * and ? are wildcards: brackets are literal, so "items[0].q" and
+    # PHP-style "user[name]" select exactly the fields List Fields prints.
+    escaped = re.escape(pattern).replace(r"\*", ".*").replace(r"\?", ".")
+    return re.compile("(?:%s)\\Z" % escaped, re.S)
+
+
+def select_regions(regions, patterns):
+    """Regions whose name matches any pattern ("user.*", "items[*].q", "file", "*")."""
+    compiled = [_field_pattern(pattern) for pattern in patterns]
+    return [region for region in regions
+            if any(pattern.match(region.name) for pattern in compiled)]
+
+
+def _json_path(stack):
+    path = ""
+    for frame in stack:
+        if frame[0] == "[":
+            path += "[%d]" % frame[1]
+        elif frame[1] is not None:
+            path += ("." if path else "") + frame[1]
+    return path or "$"
+
+
+def _json_regions(body):
+    regions = []
+    stack = []
+    expect_key = False
+    for match in _JSON_TOKEN.finditer(body):
+        token = match.group()
+        if token == "{":
+            stack.append(["{", None])
+            expect_key = True
+        elif token == "[":
+            stack.append(["[", 0])
+            expect_key = False
+        elif token in "}]":
+            if stack:
+                stack.pop()
+        elif token == ",":
+            if stack and stack[-1][0] == "[":
+                stack[-1][1] += 1
+            else:
+                expect_key = True
+        elif token == ":":
+            expect_key = False
+        elif token[0] == '"':
+            if expect_key and stack and stack[-1][0] == "{":
+                try:
+                    stack[-1][1] = json.loads(token)
+                except ValueError:
+                    stack[-1][1] = token[1:-1]
+            else:
+                regions.append(Region(_json_path(stack), match.start() + 1, match.end() - 1,
+                                      "json", None))
+    return regions
+
+
+def _xml_regions(body):
+    regions = []
+    stack = []
+    last = 0
+    for match in _XML_TOKEN.finditer(body):
+        text = body[last:match.start()]
+        if text.strip() and stack:
+            start = last + len(text) - len(text.lstrip())
+            regions.append(Region("/".join(stack), start, last + len(text.rstrip()), "xml", None))
+        last = match.end()
+        if match.group(1) is not None:
+            if stack:
+                regions.append(Region("/".join(stack), match.start(1), match.end(1), "xml", None))
+        elif match.group(2):
+            if match.group(2) in stack:
+                del stack[len(stack) - 1 - stack[::-1].index(match.group(2)):]
+        elif match.group(3):
+            path = "/".join(stack + [match.group(3)])
+            offset = match.start(4)
+            for attr in _XML_ATTR.finditer(match.group(4)):
+                group = 2 if attr.group(2) is not None else 3
+                regions.append(Region("%s@%s" % (path, attr.group(1)), offset + attr.start(group),
+                                      offset + attr.end(group), "xml", None))
+            if not match.group(5):
+                stack.append(match.group(3))
+    return regions
+
+
+def _form_regions(body):
+    regions = []
+    offset = 0
+    for pair in body.split("&"):
+        if "=" in pair:
+            name, value = pair.split("=", 1)
+            start = offset + len(name) + 1
+            regions.append(Region(unquote_plus(name), start, start + len(value), "form", None))
+        offset += len(pair) + 1
+    return regions
+
+
+def _multipart_regions(body, boundary):
+    regions = []
+    delimiter = "--" + boundary
+    position = body.find(delimiter)
+    while position >= 0:
+        head_start = body.find("\r\n", position) + 2
+        if head_start < 2 or body.startswith("--", position + len(delimiter)):
+            break
+        head_end = body.find("\r\n\r\n", head_start)
+        following = body.find("\r\n" + delimiter, head_start)
+        if head_end < 0 or following < 0 or head_end > following:
+            break
+        name = _PART_NAME.search(body, head_start, head_end)
+        regions.append(Region(name.group(1) if name else "part%d" % (len(regions) + 1),
+                              head_end + 4, following, "multipart", (head_start, head_end)))
+        position = following + 2
+    return regions
+
+
+def part_header(header, charset):
+    """A multipart part's header block with its Content-Type declaring `charset`."""
+    match = _PART_TYPE.search(header)
+    if match is None:
+        return header + "\r\nContent-Type: text/plain; charset=%s" % charset
+    line = _CHARSET_PARAM.sub("", match.group())
+    return "%s%s; charset=%s%s" % (header[:match.start()], line, charset, header[match.end():])
+
+
+class RegionSplicer(object):
+    """Renders a body with chosen regions re-encoded and everything else verbatim.
+
+    The unchanged runs between regions are converted to bytes once (Latin-1
+    when the body came from Burp, else UTF-8); render() encodes only the
+    region texts, plus rewritten part headers for multipart regions.
+    """
+
+    def __init__(self, body, regions):
+        try:
+            body.encode("iso-8859-1")
+            self.carrier = "iso-8859-1"
+        except UnicodeError:
+            self.carrier = "utf-8"
+        self.regions = []
+        spans = []
+        end = 0
+        for region in sorted(regions, key=lambda region: region.start):
+            start = region.header[0] if region.header else region.start
+            if start < end:
+                continue
+            self.regions.append(region)
+            if region.header:
+                header_start, header_end = region.header
+                spans.append((header_start, header_end, body[header_start:header_end]))
+            spans.append((region.start, region.end, None))
+            end = region.end
+        self.multipart = any([region.header is not None for region in self.regions])
+        self._static = []
+        self._slots = []
+        last = 0
+        for start, stop, header in spans:
+            self._static.append(body[last:start].encode(self.carrier))
+            if header is not None:
+                self._slots.append((header, True))
+            else:
+                self._slots.append((body[start:stop], False))
+            last = stop
+        self._static.append(body[last:].encode(self.carrier))
+
+    @property
+    def payload_chars(self):
+        return sum([region.end - region.start for region in self.regions])
+
+    def render(self, engine, encoding, charset):
+        parts = [self._static[0]]
+        for (text, is_header), static in zip(self._slots, self._static[1:]):
+            if is_header:
+                parts.append(part_header(text, charset).encode(self.carrier))
+            else:
+                parts.append(engine.encode(text, encoding))
+            parts.append(static)
+        return b"".join(parts)
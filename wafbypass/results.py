@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""Fuzz result metadata and the disk-backed store for request/response bytes."""
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from .byteutils import to_bytes
+
+
+class FuzzResult(object):
+    """Per-variant metadata; request/response bytes live in the ResultStore."""
+
+    __slots__ = ("encoding", "encoding_type", "content_type", "request_length",
+                 "request_ref", "response_ref", "status_code", "response_length",
+                 "response_time", "connect_time", "ttfb", "note", "fingerprint", "cluster",
+                 "endpoint", "response_digest")
+
+    def __init__(self, encoding, encoding_type, content_type, request_length):
+        self.encoding = encoding
+        self.encoding_type = encoding_type
+        self.content_type = content_type
+        self.request_length = request_length
+        self.request_ref = None
+        self.response_ref = None
+        self.status_code = -1
+        self.response_length = 0
+        self.response_time = 0
+        self.connect_time = None
+        self.ttfb = None
+        self.note = "Ready"
+        self.fingerprint = None
+        self.cluster = None
+        self.endpoint = None
+        self.response_digest = None
+
+
+class BlobStore(object):
+    """Append-only spill file; each blob is addressed by (offset, length).
+
+    With `base`, an existing file (a saved project) is opened read-only and
+    occupies offsets [0, base size); appended blobs land in the spill file
+    after it, so refs into the project stay valid without copying it.
+    """
+
+    def __init__(self, directory=None, base=None):
+        fd, self.path = tempfile.mkstemp(prefix="waf-bypass-", suffix=".blob", dir=directory)
+        os.close(fd)
+        self._lock = threading.Lock()
+        self._file = open(self.path, "r+b")
+        self._size = 0
+        self._base = open(base, "rb") if base else None
+        self._base_size = os.path.getsize(base) if base else 0
+
+    def append(self, data):
+        with self._lock:
+            self._file.seek(self._size)
+            self._file.write(data)
+            offset = self._base_size + self._size
+            self._size += len(data)
+            return (offset, len(data))
+
+    def read(self, ref, offset=0, length=None):
+        start, size = ref
+        if length is None or offset + length > size:
+            length = size - offset
+        start += offset
+        with self._lock:
+            if start < self._base_size:
+                self._base.seek(start)
+                return self._base.read(length)
+            self._file.seek(start - self._base_size)
+            return self._file.read(length)
+
+    @property
+    def size(self):
+        return self._base_size + self._size
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+            if self._base is not None:
+                self._base.close()
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+
+class ResultStore(object):
+    """FuzzResult metadata in memory, request/response bytes spilled to disk.
+
+    Blobs are written through to a BlobStore as they arrive and also kept
+    in an LRU of resident buffers capped at max_resident_bytes; evicted
+    blobs are read back from the file, one page at a time when viewed.
+    """
+
+    def __init__(self, max_resident_bytes=32 * 1024 * 1024, directory=None):
+        self._max_resident = max_resident_bytes
+        self._directory = directory
+        self._lock = threading.Lock()
+        self._blobs = None
+        self._results = {}
+        self._resident = OrderedDict()
+        self._resident_bytes = 0
+
+    def __len__(self):
+        return len(self._results)
+
+    def get(self, index):
+        return self._results.get(index)
+
+    def indices(self):
+        return sorted(self._results)
+
+    def add(self, index, result, request):
+        result.request_ref = self._put(request)
+        self._results[index] = result
+        return result
+
+    def set_response(self, result, response):
+        result.response_ref = self._put(response) if response else None
+
+    def request(self, result):
+        return self._get(result.request_ref)
+
+    def response(self, result):
+        return self._get(result.response_ref)
+
+    def read(self, ref, offset, length):
+        with self._lock:
+            data = self._resident.get(ref)
+        if data is not None:
+            return data[offset:offset + length]
+        return self._blobs.read(ref, offset, length)
+
+    def attach(self, path, results):
+        """Serve blobs from a saved project file; `results` maps index -> FuzzResult."""
+        self.clear()
+        blobs = BlobStore(self._directory, base=path)
+        with self._lock:
+            self._blobs = blobs
+            self._results = dict(results)
+
+    def rebase(self, path, staged, refs):
+        """Swap in a freshly written project: `staged` replaces `path` and
+        becomes the blob base; refs maps index -> (request_ref, response_ref).
+        """
+        with self._lock:
+            old, self._blobs = self._blobs, None
+            if old is not None:
+                old.close()
+            for index, (request_ref, response_ref) in refs.items():
+                result = self._results.get(index)
+                if result is not None:
+                    result.request_ref, result.response_ref = request_ref, response_ref
+            self._resident.clear()
+            self._resident_bytes = 0
+            try:
+                if os.path.exists(path):
+                    os.remove(path)
+                os.rename(staged, path)
+            except OSError:
+                # Keep serving from the staged copy so no result is lost.
+                self._blobs = BlobStore(self._directory, base=staged)
+                raise
+            self._blobs = BlobStore(self._directory, base=path)
+
+    def clear(self):
+        with self._lock:
+            blobs, self._blobs = self._blobs, None
+            self._results = {}
+            self._resident.clear()
+            self._resident_bytes = 0
+        if blobs is not None:
+            blobs.close()
+
+    close = clear
+
+    @property
+    def resident_bytes(self):
+        return self._resident_bytes
+
+    @property
+    def stored_bytes(self):
+        blobs = self._blobs
+        return blobs.size if blobs is not None else 0
+
+    def _put(self, data):
+        data = to_bytes(data)
+        with self._lock:
+            if self._blobs is None:
+                self._blobs = BlobStore(self._directory)
+            blobs = self._blobs
+        ref = blobs.append(data)
+        self._remember(ref, data)
+        return ref
+
+    def _get(self, ref):
+        if ref is None:
+            return None
+        with self._lock:
+            data = self._resident.pop(ref, None)
+            if data is not None:
+                self._resident[ref] = data
+                return data
+        data = self._blobs.read(ref)
+        self._remember(ref, data)
+        return data
+
+    def _remember(self, ref, data):
+        if len(data) > self._max_resident // 4:
+            return
+        with self._lock:
+            if ref in self._resident:
+                return
+            self._resident[ref] = data
+            self._resident_bytes += len(data)
+            while self._resident_bytes > self._max_resident:
+                _, evicted = self._resident.popitem(last=False)
+                self._resident_bytes -= len(evicted)
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""Adaptive send queue that learns from responses as they arrive."""
+import threading
+from collections import OrderedDict, deque
+
+
+class _Lane(object):
+    """Pending jobs and response statistics for one endpoint."""
+
+    def __init__(self):
+        self.first = deque()
+        self.buckets = OrderedDict()
+        self.families = {}
+        self.mimes = {}
+        self.bypasses = 0
+        self.awaiting_baseline = False
+        self.size = 0
+
+    def stats(self, table, name):
+        if name not in table:
+            table[name] = [0, 0, 0]
+        return table[name]
+
+
+def _rate(stats):
+    sent, _, bypasses = stats
+    return (bypasses + 1.0) / (sent + 2.0)
+
+
+def _mime(content_type):
+    return content_type.split(";", 1)[0].strip().lower()
+
+
+class AdaptiveScheduler(object):
+    """Dispatcher queue that reorders and prunes variants by observed verdicts.
+
+    Jobs are grouped per endpoint by encoding family (the ENCODINGS type
+    column) and Content-Type mime type. Each pop serves endpoints round-robin
+    and picks the bucket with the best smoothed bypass rate, exploring the
+    least-tried family on ties. Baselines go first, and an endpoint's other
+    variants are held until its baseline response is in. Once
+    block_threshold variants of a family come back like the baseline with
+    no bypass in that family, its remaining siblings are skipped; after
+    max_bypasses confirmed bypasses the endpoint stops altogether.
+    """
+
+    def __init__(self, block_threshold=3, max_bypasses=3, on_skip=None, wake=None):
+        self._lock = threading.Lock()
+        self.block_threshold = block_threshold
+        self.max_bypasses = max_bypasses
+        self._on_skip = on_skip
+        self._wake = wake
+        self._lanes = OrderedDict()
+        self._order = deque()
+        self._size = 0
+
+    def configure(self, block_threshold, max_bypasses):
+        with self._lock:
+            self.block_threshold = block_threshold
+            self.max_bypasses = max_bypasses
+
+    def __len__(self):
+        return self._size
+
+    def push(self, job):
+        result = job.key[1] if job.key else None
+        endpoint = result.endpoint if result is not None else None
+        with self._lock:
+            lane = self._lane(endpoint.id if endpoint else 0)
+            if endpoint is None or job.key[0] == endpoint.baseline_index:
+                lane.first.append(job)
+                if endpoint is not None and endpoint.clusters.baseline is None:
+                    lane.awaiting_baseline = True
+            else:
+                bucket = (result.encoding_type, _mime(result.content_type))
+                if bucket not in lane.buckets:
+                    lane.buckets[bucket] = deque()
+                lane.buckets[bucket].append(job)
+            lane.size += 1
+            self._size += 1
+
+    def pop(self):
+        with self._lock:
+            for _ in range(len(self._order)):
+                lane_id = self._order[0]
+                self._order.rotate(-1)
+                job = self._take(self._lanes[lane_id])
+                if job is not None:
+                    self._size -= 1
+                    return job
+            return None
+
+    def drain(self):
+        with self._lock:
+            jobs = []
+            for lane in self._lanes.values():
+                jobs.extend(lane.first)
+                for bucket in lane.buckets.values():
+                    jobs.extend(bucket)
+            self._lanes.clear()
+            self._order.clear()
+            self._size = 0
+            return jobs
+
+    def clear(self):
+        return len(self.drain())
+
+    def observe(self, index, result):
+        """Learn from a finished send of the job keyed (index, result)."""
+        endpoint = result.endpoint
+        if endpoint is None:
+            return
+        skipped = []
+        with self._lock:
+            lane = self._lanes.get(endpoint.id)
+            if lane is None:
+                return
+            if index == endpoint.baseline_index:
+                lane.awaiting_baseline = False
+            else:
+                verdict = endpoint.clusters.verdict(result.cluster)
+                family = lane.stats(lane.families, result.encoding_type)
+                mime = lane.stats(lane.mimes, _mime(result.content_type))
+                for stats in (family, mime):
+                    stats[0] += 1
+                    if verdict == "Same as baseline":
+                        stats[1] += 1
+                    elif verdict == "DIFFERS":
+                        stats[2] += 1
+                if verdict == "DIFFERS":
+                    lane.bypasses += 1
+                if self.max_bypasses > 0 and lane.bypasses >= self.max_bypasses:
+                    skipped = self._drop(lane, lambda bucket: True,
+                                         "Skipped: %d bypasses found" % lane.bypasses)
+                elif self.block_threshold > 0 and family[1] >= self.block_threshold and not family[2]:
+                    skipped = self._drop(lane, lambda bucket: bucket[0] == result.encoding_type,
+                                         "Skipped: %s blocked" % result.encoding_type)
+        if self._wake is not None and index == endpoint.baseline_index:
+            self._wake()
+        if self._on_skip is not None:
+            for job, reason in skipped:
+                self._on_skip(job, reason)
+
+    def _lane(self, lane_id):
+        lane = self._lanes.get(lane_id)
+        if lane is None:
+            lane = self._lanes[lane_id] = _Lane()
+            self._order.append(lane_id)
+        return lane
+
+    def _take(self, lane):
+        if lane.first:
+            lane.size -= 1
+            return lane.first.popleft()
+        if lane.awaiting_baseline or not lane.size:
+            return None
+        best, best_score = None, None
+        for bucket, jobs in lane.buckets.items():
+            if not jobs:
+                continue
+            family = lane.stats(lane.families, bucket[0])
+            score = (_rate(family) + _rate(lane.stats(lane.mimes, bucket[1])), -family[0])
+            if best is None or score > best_score:
+                best, best_score = bucket, score
+        lane.size -= 1
+        return lane.buckets[best].popleft()
+
+    def _drop(self, lane, matches, reason):
+        skipped = []
+        for bucket, jobs in lane.buckets.items():
+            if jobs and matches(bucket):
+                skipped.extend([(job, reason) for job in jobs])
+                jobs.clear()
+        lane.size -= len(skipped)
+        self._size -= len(skipped)
+        return skipped
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""Pre-parsed HTTP request template that renders fuzz variants."""
+from .byteutils import as_bytes
+
+
+class RequestTemplate(object):
+    """Raw HTTP request parsed once and re-rendered around new bodies.
+
+    Header lines are encoded up front and folded into constant byte runs;
+    only the Content-Type and Content-Length slots change per variant, so
+    rendering is a single join of pre-built segments and the encoded body.
+    """
+
+    CONTENT_TYPE = "ct"
+    CONTENT_LENGTH = "cl"
+
+    def __init__(self, raw_request):
+        raw_request = raw_request.replace("\r\n", "\n").replace("\n", "\r\n")
+        if "\r\n\r\n" in raw_request:
+            head, self.body = raw_request.split("\r\n\r\n", 1)
+        else:
+            head, self.body = raw_request, ""
+        self.headers = [line for line in head.split("\r\n") if line]
+        self.content_type_slots = []
+        self.content_length_slots = []
+        for i, line in enumerate(self.headers):
+            line_lower = line[:15].lower()
+            if line_lower.startswith("content-type:"):
+                self.content_type_slots.append(i)
+            elif line_lower.startswith("content-length:"):
+                self.content_length_slots.append(i)
+        self._segments = {}
+
+    @property
+    def content_type(self):
+        for i in self.content_type_slots[:1]:
+            return self.headers[i].split(":", 1)[1].strip()
+        return ""
+
+    @property
+    def raw(self):
+        return "\r\n".join(self.headers) + "\r\n\r\n" + self.body
+
+    def _compile(self, update_ct, update_cl):
+        slots = {}
+        if update_ct:
+            for i in self.content_type_slots:
+                slots[i] = self.CONTENT_TYPE
+        if update_cl:
+            for i in self.content_length_slots:
+                slots[i] = self.CONTENT_LENGTH
+        segments = []
+        run = []
+        for i, line in enumerate(self.headers):
+            if i in slots:
+                if run:
+                    segments.append("".join(run).encode("iso-8859-1"))
+                    run = []
+                segments.append(slots[i])
+            else:
+                run.append(line + "\r\n")
+        if run:
+            segments.append("".join(run).encode("iso-8859-1"))
+        if update_ct and not self.content_type_slots:
+            segments.append(self.CONTENT_TYPE)
+        if update_cl and not self.content_length_slots:
+            segments.append(self.CONTENT_LENGTH)
+        segments.append(b"\r\n")
+        return segments
+
+    def _head_parts(self, content_type, content_length, update_ct, update_cl):
+        key = (update_ct, update_cl)
+        segments = self._segments.get(key)
+        if segments is None:
+            segments = self._segments[key] = self._compile(update_ct, update_cl)
+        ct_line = ("Content-Type: %s\r\n" % content_type).encode("iso-8859-1")
+        cl_line = ("Content-Length: %d\r\n" % content_length).encode("iso-8859-1")
+        parts = []
+        for segment in segments:
+            if segment is self.CONTENT_TYPE:
+                parts.append(ct_line)
+            elif segment is self.CONTENT_LENGTH:
+                parts.append(cl_line)
+            else:
+                parts.append(segment)
+        return parts
+
+    def render(self, encoded_body, content_type, update_ct=True, update_cl=True):
+        encoded_body = as_bytes(encoded_body)
+        parts = self._head_parts(content_type, len(encoded_body), update_ct, update_cl)
+        parts.append(encoded_body)
+        return b"".join(parts)
+
+    def render_chunks(self, chunks, content_type, update_ct=True, update_cl=True):
+        """Render around a stream of encoded body chunks.
+
+        Content-Length is summed from the stream, and the chunks are copied
+        once, straight into the final request; the encoded body is never
+        joined into a separate string of its own.
+        """
+        body_parts = []
+        length = 0
+        for chunk in chunks:
+            body_parts.append(chunk)
+            length += len(chunk)
+        parts = self._head_parts(content_type, length, update_ct, update_cl)
+        parts.extend(body_parts)
+        del body_parts
+        return b"".join(parts)
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""Translate tables for single-byte charsets, derived from one Latin-1 encode.
+
+EBCDIC, ISO-8859-x and Windows-125x are fixed maps over Latin-1 text, so
+the Latin-1 bytes of a body (one fast codec pass, cached by the engine)
+go through a 256-entry bytes.translate table instead of a charmap codec.
+Tables are probed from the real codecs, so output is byte-identical.
+"""
+import codecs
+
+LATIN1 = "iso-8859-1"
+
+SINGLE_BYTE = ("cp037", "cp500", "cp1026", "iso-8859-15", "windows-1252")
+
+_tables = {}
+
+
+class TranslateTable(object):
+    """Latin-1 -> single-byte charset map; bytes it cannot map are `invalid`."""
+
+    base = LATIN1
+
+    def __init__(self, codec_name):
+        table = bytearray(range(256))
+        invalid = bytearray()
+        for i in range(256):
+            try:
+                encoded = codecs.encode(bytearray([i]).decode(LATIN1), codec_name)
+            except UnicodeError:
+                invalid.append(i)
+                continue
+            table[i] = bytearray(encoded)[0]
+        self.table = bytes(table)
+        self.invalid = bytes(invalid)
+
+    def apply(self, latin1_bytes):
+        """Translated bytes, or None if the codec would reject some character."""
+        if self.invalid and len(latin1_bytes.translate(None, self.invalid)) != len(latin1_bytes):
+            return None
+        return latin1_bytes.translate(self.table)
+
+
+def transcoder_for(codec_name):
+    """Shared TranslateTable for an EncodingEngine codec name, or None."""
+    if codec_name not in SINGLE_BYTE:
+        return None
+    table = _tables.get(codec_name)
+    if table is None:
+        table = _tables[codec_name] = TranslateTable(codec_name)
+    return table
@@ -0,0 +1,369 @@
+# -*- coding: utf-8 -*-
+"""Pluggable transports that deliver rendered requests to the target."""
+import socket
+import threading
+import time
+from collections import namedtuple
+
+Target = namedtuple("Target", ["host", "port", "use_https"])
+
+
+class Transport(object):
+    """Sends one raw request and returns the raw response bytes, or None."""
+
+    def send(self, target, request):
+        raise NotImplementedError
+
+    def exchange(self, target, request):
+        """send() plus timings: (response, connect_ms, ttfb_ms), None when unknown."""
+        return self.send(target, request), None, None
+
+    def close(self):
+        pass
+
+
+def _status_of(status_line):
+    parts = status_line.split(None, 2)
+    if len(parts) > 1 and parts[1].isdigit():
+        return int(parts[1])
+    return -1
+
+
+def read_http_response(reader, head_only=False):
+    """Read one HTTP/1.x response from a buffered socket reader.
+
+    Honours Content-Length and chunked transfer coding (the chunk framing
+    is kept, as Burp returns it); otherwise reads until the peer closes.
+    Interim 1xx responses are skipped.
+    """
+    while True:
+        lines = []
+        while True:
+            line = reader.readline(65537)
+            if not line:
+                break
+            lines.append(line)
+            if line in (b"\r\n", b"\n"):
+                break
+        if not lines:
+            return None
+        status = _status_of(lines[0])
+        if not 100 <= status < 200:
+            break
+    head = b"".join(lines)
+    length = None
+    chunked = False
+    for line in lines[1:]:
+        name, _, value = line.partition(b":")
+        name = name.strip().lower()
+        if name == b"content-length":
+            length = int(value.strip())
+        elif name == b"transfer-encoding" and b"chunked" in value.lower():
+            chunked = True
+    if head_only or status in (204, 304):
+        return head
+    if chunked:
+        parts = [head]
+        while True:
+            size_line = reader.readline(65537)
+            if not size_line:
+                break
+            parts.append(size_line)
+            size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+            if size == 0:
+                while True:
+                    trailer = reader.readline(65537)
+                    parts.append(trailer)
+                    if trailer in (b"\r\n", b"\n", b""):
+                        break
+                break
+            parts.append(reader.read(size + 2))
+        return b"".join(parts)
+    if length is not None:
+        return head + reader.read(length)
+    return head + reader.read()
+
+
+def _elapsed_ms(start, end):
+    return int((end - start) * 1000)
+
+
+class _FirstByteReader(object):
+    """Reader wrapper that stamps the time its first read returns data."""
+
+    def __init__(self, reader):
+        self._reader = reader
+        self.first_byte = None
+
+    def _stamp(self, data):
+        if data and self.first_byte is None:
+            self.first_byte = time.time()
+        return data
+
+    def readline(self, limit=-1):
+        return self._stamp(self._reader.readline(limit))
+
+    def read(self, size=-1):
+        return self._stamp(self._reader.read(size))
+
+    def close(self):
+        self._reader.close()
+
+
+def keep_alive_request(request):
+    """Rewrite the Connection header of a raw request to keep-alive."""
+    end = request.find(b"\r\n\r\n")
+    if end < 0:
+        return request
+    lines = [line for line in request[:end].split(b"\r\n")
+             if line[:11].lower() != b"connection:"]
+    lines.append(b"Connection: keep-alive")
+    return b"\r\n".join(lines) + request[end:]
+
+
+def keeps_alive(response, head_only=False):
+    """True when the connection can carry another request after `response`."""
+    end = response.find(b"\r\n\r\n")
+    lines = response[:end if end >= 0 else len(response)].split(b"\r\n")
+    persistent = not lines[0].startswith(b"HTTP/1.0")
+    framed = head_only or _status_of(lines[0]) in (204, 304)
+    for line in lines[1:]:
+        name, _, value = line.partition(b":")
+        name = name.strip().lower()
+        value = value.strip().lower()
+        if name == b"connection":
+            persistent = value == b"keep-alive" or (persistent and value != b"close")
+        elif name == b"content-length" or (name == b"transfer-encoding" and b"chunked" in value):
+            framed = True
+    return persistent and framed
+
+
+def tls_context():
+    # Targets under test routinely use self-signed certificates; Burp's own
+    # makeHttpRequest does not verify them either. ssl is imported here
+    # because inside Burp only SocketTransport needs it, and it is one of
+    # the slowest modules to load under Jython.
+    import ssl
+
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+class SocketTransport(Transport):
+    """One plain-socket connection per request, for runs outside Burp."""
+
+    def __init__(self, timeout=30.0):
+        self.timeout = timeout
+        self._context = None
+
+    def send(self, target, request):
+        return self.exchange(target, request)[0]
+
+    def exchange(self, target, request):
+        start = time.time()
+        sock = self._connect(target)
+        try:
+            connected = time.time()
+            sock.sendall(request)
+            reader = _FirstByteReader(sock.makefile("rb"))
+            try:
+                response = read_http_response(reader, request.startswith(b"HEAD "))
+            finally:
+                reader.close()
+        finally:
+            sock.close()
+        ttfb = _elapsed_ms(connected, reader.first_byte) if reader.first_byte else None
+        return response, _elapsed_ms(start, connected), ttfb
+
+    def _connect(self, target):
+        sock = socket.create_connection((target.host, target.port), self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if target.use_https:
+            if self._context is None:
+                self._context = tls_context()
+            try:
+                sock = self._context.wrap_socket(sock, server_hostname=target.host)
+            except Exception:
+                sock.close()
+                raise
+        return sock
+
+
+class _Connection(object):
+    """One pooled keep-alive connection; responses are read in write order."""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.reader = _FirstByteReader(sock.makefile("rb"))
+        self.write_lock = threading.Lock()
+        self.cond = threading.Condition()
+        self.reserved = 0
+        self.written = 0
+        self.received = 0
+        self.reusable = True
+        self.broken = False
+
+    def close(self):
+        try:
+            self.reader.close()
+            self.sock.close()
+        except (IOError, OSError):
+            pass
+
+
+class _ConnectionLost(IOError):
+    pass
+
+
+class KeepAliveTransport(SocketTransport):
+    """Pooled keep-alive connections per (host, port, tls), optionally pipelined.
+
+    Up to max_connections sockets are kept per target and each carries at
+    most pipeline_depth requests in flight; responses are matched to
+    requests by write order. A request that fails on a reused connection
+    is retried once on a fresh one. Targets that close the connection
+    after every response are handed to `fallback` (makeHttpRequest inside
+    Burp) from then on, as is any request that fails on a fresh socket.
+    """
+
+    def __init__(self, fallback=None, timeout=30.0, max_connections=4, pipeline_depth=1):
+        SocketTransport.__init__(self, timeout)
+        self.fallback = fallback
+        self.max_connections = max(1, int(max_connections))
+        self.pipeline_depth = max(1, int(pipeline_depth))
+        self._cond = threading.Condition()
+        self._pools = {}
+        self._opening = {}
+        self._fallback_targets = set()
+
+    def configure(self, max_connections, pipeline_depth):
+        with self._cond:
+            self.max_connections = max(1, int(max_connections))
+            self.pipeline_depth = max(1, int(pipeline_depth))
+            self._cond.notify_all()
+
+    def uses_fallback(self, target):
+        return tuple(target) in self._fallback_targets
+
+    def exchange(self, target, request):
+        key = tuple(target)
+        if key in self._fallback_targets:
+            return self._fall_back(target, request)
+        persistent = keep_alive_request(request)
+        head_only = request.startswith(b"HEAD ")
+        for _ in range(2):
+            try:
+                conn, connect_ms = self._acquire(key, target)
+            except (IOError, OSError):
+                return self._fall_back(target, request)
+            fresh = connect_ms is not None
+            try:
+                response, ttfb = self._roundtrip(conn, persistent, head_only)
+            except (IOError, OSError):
+                self._release(key, conn, broken=True)
+                if fresh:
+                    return self._fall_back(target, request)
+                self._retire_idle(key)
+                continue
+            except Exception:
+                self._release(key, conn, broken=True)
+                raise
+            if not keeps_alive(response, head_only):
+                conn.reusable = False
+                if fresh and conn.received == 1:
+                    self._fallback_targets.add(key)
+            self._release(key, conn)
+            return response, connect_ms if fresh else 0, ttfb
+        return self._fall_back(target, request)
+
+    def close(self):
+        with self._cond:
+            pools, self._pools = self._pools, {}
+            self._fallback_targets = set()
+        for conns in pools.values():
+            for conn in conns:
+                conn.close()
+        if self.fallback is not None:
+            self.fallback.close()
+
+    def _fall_back(self, target, request):
+        if self.fallback is None:
+            return SocketTransport.exchange(self, target, request)
+        return self.fallback.exchange(target, request)
+
+    def _acquire(self, key, target):
+        with self._cond:
+            while True:
+                conns = self._pools.setdefault(key, [])
+                open_conns = [c for c in conns if c.reusable and not c.broken
+                              and c.reserved < self.pipeline_depth]
+                if open_conns:
+                    conn = min(open_conns, key=lambda c: c.reserved)
+                    conn.reserved += 1
+                    return conn, None
+                if len(conns) + self._opening.get(key, 0) < self.max_connections:
+                    self._opening[key] = self._opening.get(key, 0) + 1
+                    break
+                self._cond.wait(1.0)
+        start = time.time()
+        try:
+            conn = _Connection(self._connect(target))
+            conn.reserved = 1
+        finally:
+            with self._cond:
+                self._opening[key] -= 1
+        connect_ms = _elapsed_ms(start, time.time())
+        with self._cond:
+            self._pools.setdefault(key, []).append(conn)
+        return conn, connect_ms
+
+    def _release(self, key, conn, broken=False):
+        if broken:
+            with conn.cond:
+                conn.broken = True
+                conn.cond.notify_all()
+        with self._cond:
+            conn.reserved -= 1
+            if (conn.broken or not conn.reusable) and conn.reserved <= 0:
+                conns = self._pools.get(key, [])
+                if conn in conns:
+                    conns.remove(conn)
+                conn.close()
+            self._cond.notify_all()
+
+    def _retire_idle(self, key):
+        # A reused socket failing usually means the server timed out idle
+        # keep-alives; its idle siblings are most likely stale as well.
+        with self._cond:
+            conns = self._pools.get(key, [])
+            idle = [conn for conn in conns if conn.reserved == 0]
+            for conn in idle:
+                conns.remove(conn)
+            self._cond.notify_all()
+        for conn in idle:
+            conn.close()
+
+    def _roundtrip(self, conn, request, head_only):
+        with conn.write_lock:
+            if conn.broken:
+                raise _ConnectionLost("connection closed")
+            ticket = conn.written
+            conn.written += 1
+            conn.sock.sendall(request)
+            sent = time.time()
+        with conn.cond:
+            while conn.received != ticket and not conn.broken:
+                conn.cond.wait()
+            if conn.broken:
+                raise _ConnectionLost("connection closed")
+        conn.reader.first_byte = None
+        response = read_http_response(conn.reader, head_only)
+        if not response:
+            raise _ConnectionLost("connection closed by peer")
+        ttfb = _elapsed_ms(sent, conn.reader.first_byte) if conn.reader.first_byte else None
+        with conn.cond:
+            conn.received += 1
+            conn.cond.notify_all()
+        return response, ttfb